@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 import logging
 import os
 import clips
@@ -7,34 +7,40 @@ from flask_cors import CORS
 import uuid
 import json
 import time
+import hashlib
+import operator
+import queue
+import threading
+import atexit
 import db
 from shutil import copyfile
 from location_service import location_service
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding for hot endpoints
+    orjson = None
+
 # Flask application instance
 app = Flask(__name__)
 
 # Enable CORS for local/dev usage. Configure origins in production as needed.
 CORS(app)
 
-# Initialize CLIPS Environment at module import time for high performance
-# CLIPS_ENV is a global Environment instance that will be reused across requests
-CLIPS_ENV = clips.Environment()
-
-# Load CLIPS knowledge base files once at startup
+# CLIPS knowledge base files, loaded into every pooled environment
+# (see _checkout_environment)
 _kb_dir = os.path.join(os.path.dirname(__file__), "knowledge_base")
 _templates_path = os.path.join(_kb_dir, "templates.clp")
 _rules_path = os.path.join(_kb_dir, "rules.clp")
 
+# Frontend paths are resolved once; index() only checks the cached flag
+_STATIC_DIR = app.static_folder
+_SIMPLE_PATH = os.path.join(_STATIC_DIR, 'simple.html')
+_SIMPLE_EXISTS = os.path.isfile(_SIMPLE_PATH)
+
 for _path in (_templates_path, _rules_path):
-    try:
-        if os.path.isfile(_path):
-            CLIPS_ENV.load(_path)
-            logging.info(f"Loaded CLIPS file: {_path}")
-        else:
-            logging.warning(f"CLIPS file not found (will skip): {_path}")
-    except Exception as _e:
-        logging.exception(f"Error loading CLIPS file {_path}: {_e}")
+    if not os.path.isfile(_path):
+        logging.warning(f"CLIPS file not found (will skip): {_path}")
 
 # Initialize local DB for symptoms/diseases
 try:
@@ -44,6 +50,18 @@ except Exception:
     logging.exception('Failed to initialize DB')
 
 
+def _dumps(obj):
+    """Serialize obj to compact JSON with sorted keys (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return app.json.dumps(obj, separators=(',', ':'))
+
+
+def _json_response(obj, status=200):
+    """jsonify() replacement for hot endpoints, encoding via _dumps."""
+    return Response(_dumps(obj), status=status, mimetype='application/json')
+
+
 @app.route('/health')
 def health():
     """Return a simple JSON 'OK' response for health checks."""
@@ -54,46 +72,99 @@ def health():
 @app.route('/')
 def index():
     """Serve the simple, accessible frontend."""
-    static_dir = os.path.join(os.path.dirname(__file__), 'static')
-    simple_path = os.path.join(static_dir, 'simple.html')
-    if os.path.isfile(simple_path):
-        return send_from_directory(static_dir, 'simple.html')
+    if _SIMPLE_EXISTS:
+        # conditional GET: ETag/Last-Modified let browsers revalidate with a 304
+        return send_from_directory(_STATIC_DIR, 'simple.html', conditional=True)
     return (
         "<h1>Not Found</h1><p>No frontend available.</p>",
         404,
     )
 
 
-def _clone_environment():
-    """Return a cloned CLIPS Environment based on the pre-loaded CLIPS_ENV.
+# Idle CLIPS environments shared by all request threads, as (generation,
+# env). A triage checks one out, runs on it and hands it back reset, so the
+# knowledge base is loaded once per pooled environment whatever the server's
+# threading model. At most _ENV_POOL_SIZE are kept; a checkout that finds
+# the pool empty builds a new one. Publishing bumps _KB_GENERATION, and
+# environments from an older generation are dropped instead of reused.
+_ENV_POOL_SIZE = 8
+_ENV_POOL = queue.Queue(maxsize=_ENV_POOL_SIZE)
+_KB_GENERATION = 0
 
-    Prefer using CLIPS_ENV.clone() when available. If clone() is not
-    available or fails, fall back to creating a fresh Environment and
-    loading the same knowledge base files. This keeps the global
-    preloaded environment untouched and provides per-request isolation.
-    """
-    if hasattr(CLIPS_ENV, 'clone'):
-        try:
-            return CLIPS_ENV.clone()
-        except Exception:
-            logging.exception("CLIPS_ENV.clone() failed; falling back to new Environment")
-    # Fallback
+
+def _new_environment():
+    """Return a fresh CLIPS Environment loaded with the knowledge base files."""
     env = clips.Environment()
     for _path in (_templates_path, _rules_path):
         if os.path.isfile(_path):
             try:
                 env.load(_path)
             except Exception:
-                logging.exception(f"Failed to load CLIPS file into cloned env: {_path}")
+                logging.exception(f"Failed to load CLIPS file into pooled env: {_path}")
     return env
 
 
+def _checkout_environment():
+    """Take an environment for the current knowledge base from the pool.
+
+    Returns (generation, env) with env reset and ready to run; pass both to
+    _return_environment when done.
+    """
+    generation = _KB_GENERATION
+    while True:
+        try:
+            env_generation, env = _ENV_POOL.get_nowait()
+        except queue.Empty:
+            env_generation, env = generation, _new_environment()
+            break
+        if env_generation == generation:
+            break
+    env.reset()
+    return env_generation, env
+
+
+def _return_environment(generation, env):
+    """Reset `env` and put it back in the pool unless it is stale or the pool is full."""
+    if generation != _KB_GENERATION:
+        return
+    try:
+        # Drop this patient's facts so the idle env doesn't hold them
+        env.reset()
+        _ENV_POOL.put_nowait((generation, env))
+    except queue.Full:
+        pass
+    except Exception:
+        logging.exception('Failed to reset CLIPS environment; discarding it')
+
+
+# Serialized bodies of the DB listing endpoints as (generation, body). A body
+# is rebuilt only after a write bumps the table's generation in db.
+_LISTING_BODIES = {}
+
+
+def _listing_response(table, key=None):
+    """Return the JSON listing of a DB table, serialized once per write generation.
+
+    When `key` is given the rows are wrapped as {key: rows}.
+    """
+    gen = db.generation(table)
+    cached = _LISTING_BODIES.get(table)
+    if cached is None or cached[0] != gen:
+        rows = db.get_cached(table)
+        body = _dumps({key: rows} if key else rows)
+        cached = (gen, body)
+        _LISTING_BODIES[table] = cached
+    return Response(cached[1], mimetype='application/json')
+
+
 @app.route('/api/symptoms', methods=['GET', 'POST'])
 def api_symptoms():
     if request.method == 'GET':
         try:
-            symptoms = db.list_symptoms()
-            return jsonify({'symptoms': symptoms})
+            age = request.args.get('age', type=int)
+            if age is not None:
+                return _json_response({'symptoms': db.list_symptoms_for_age(age)})
+            return _listing_response('symptoms', 'symptoms')
         except Exception as e:
             logging.exception('Failed to list symptoms')
             return jsonify({'error': str(e)}), 500
@@ -116,7 +187,7 @@ def api_symptoms():
 def api_diseases():
     if request.method == 'GET':
         try:
-            return jsonify(db.list_diseases())
+            return _listing_response('diseases')
         except Exception as e:
             logging.exception('Failed to list diseases')
             return jsonify({'error': str(e)}), 500
@@ -139,7 +210,7 @@ def api_rules():
     method = request.method
     if method == 'GET':
         try:
-            return jsonify(db.list_rules())
+            return _listing_response('rules')
         except Exception as e:
             logging.exception('Failed to list rules')
             return jsonify({'error': str(e)}), 500
@@ -170,6 +241,51 @@ def api_rules():
             return jsonify({'error': str(e)}), 500
 
 
+# Comparison operators accepted for the `age` field of JSON rule conditions
+_AGE_OPS = {
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '=': operator.eq,
+    '!=': operator.ne,
+}
+
+# Turns free text into CLIPS symbol form by replacing spaces with hyphens
+_SYMBOL_TABLE = str.maketrans(' ', '-')
+
+# Values safe to splice into a CLIPS expression: a single symbol token
+_CLIPS_SYMBOL = re.compile(r'[A-Za-z][A-Za-z0-9_-]*')
+
+# LHS pattern builders for translate_rules_to_clp, keyed by condition field.
+# Each takes (operator, value) and returns a CLIPS pattern, or None when the
+# operator is not supported for that field. More fields can be added here.
+_COND_HANDLERS = {
+    # (patient-demographics (age ?age&:(> ?age 65)))
+    'age': lambda op, v: (
+        f"(patient-demographics (age ?age&:({op} ?age {int(v)})))" if op in _AGE_OPS else None
+    ),
+    'history': lambda op, v: (
+        f"(patient-history (history {str(v).translate(_SYMBOL_TABLE)}))" if op in ('=', 'contains') else None
+    ),
+    'symptom': lambda op, v: (
+        f"(patient-symptom (name {str(v).translate(_SYMBOL_TABLE)}))" if op in ('contains', '=', 'in') else None
+    ),
+}
+
+
+# Safe default fallback rule appended to every translated rule set
+_DEFAULT_RULE = '''
+(defrule R0_Default_Triage
+    "Safe default: non-urgent GREEN when no other triage-result asserted."
+    (declare (salience 0))
+    (not (triage-result))
+    =>
+    (assert (triage-result (level GREEN) (score 5) (transport none) (rationale "Default non-urgent triage. No high-priority rules matched.")))
+)
+'''
+
+
 def translate_rules_to_clp(rules_list):
     """Translate a list of rule JSON objects to a CLIPS rulestring.
 
@@ -191,19 +307,12 @@ def translate_rules_to_clp(rules_list):
         # Build LHS
         lhs = []
         for c in conds:
-            f = c.get('field')
-            op = c.get('operator')
-            v = c.get('value')
-            if f == 'age' and op in ('>','<','>=','<=','=','!='):
-                # (patient-demographics (age ?age&:(> ?age 65)))
-                lhs.append(f"(patient-demographics (age ?age&:({op} ?age {int(v)})))")
-            elif f == 'history' and op in ('=','contains'):
-                val = str(v).replace(' ', '-')
-                lhs.append(f"(patient-history (history {val}))")
-            elif f == 'symptom' and op in ('contains','=','in'):
-                val = str(v).replace(' ', '-')
-                lhs.append(f"(patient-symptom (name {val}))")
-            # More fields/operators can be added here
+            handler = _COND_HANDLERS.get(c.get('field'))
+            if handler is None:
+                continue
+            pattern = handler(c.get('operator'), c.get('value'))
+            if pattern is not None:
+                lhs.append(pattern)
 
         # Build RHS actions
         rhs_parts = []
@@ -245,30 +354,219 @@ def translate_rules_to_clp(rules_list):
         rule_lines.append(')')
         pieces.append('\n'.join(rule_lines))
 
-        body = '\n\n'.join(pieces)
-        # Append a safe default fallback rule (low salience) so there's always a triage-result
-        default_rule = '''
-(defrule R0_Default_Triage
-    "Safe default: non-urgent GREEN when no other triage-result asserted."
-    (declare (salience 0))
-    (not (triage-result))
-    =>
-    (assert (triage-result (level GREEN) (score 5) (transport none) (rationale "Default non-urgent triage. No high-priority rules matched.")))
-)
-'''
-        return body + '\n\n' + default_rule
+    body = '\n\n'.join(pieces)
+    # Append a safe default fallback rule (low salience) so there's always a triage-result
+    return body + '\n\n' + _DEFAULT_RULE
+
+
+# Collapses runs of whitespace in rationale text
+_RE_WS = re.compile(r'\s+')
+
+# Slot defaults of the triage-result deftemplate (templates.clp). A CLIPS rule
+# that omits a slot gets these values, so compiled rules start from them too.
+_TRIAGE_RESULT_DEFAULTS = {
+    'triage_level': 'RED',
+    'score': 0,
+    'transport': 'ambulance',
+    'rationale': '',
+}
+
+# Result of the R0_Default_Triage fallback rule appended by the translator
+_DEFAULT_TRIAGE_RESULT = {
+    'triage_level': 'GREEN',
+    'score': 5,
+    'transport': 'none',
+    'rationale': 'Default non-urgent triage. No high-priority rules matched.',
+}
+
+_GENERATED_HEADER = ';; Generated by admin publish\n'
+_DIGEST_PREFIX = ';; rules-digest: '
+
+# Part of the rules digest: bump whenever translate_rules_to_clp (or
+# _DEFAULT_RULE) changes its output, so publish rewrites rules.clp even
+# though the rules themselves are unchanged
+_TRANSLATOR_VERSION = 1
+
+# Translated CLP text per rules digest, so toggling between rule sets doesn't
+# re-run the translator
+_CLP_CACHE = {}
+_CLP_CACHE_MAX = 16
+
+# Published DB rules compiled to Python predicates for the /triage fast path.
+# None whenever the active rules.clp was not generated from the current DB
+# rules (e.g. the hand-written knowledge base), or compile_rules can't order
+# them the way CLIPS would; CLIPS is used then.
+_COMPILED_RULES = None
+
+# One bit per symptom symbol seen by compile_rules. Bits are only ever added,
+# so masks built against an older compile stay valid.
+_SYMPTOM_BITS = {}
+_SYMPTOM_BITS_LOCK = threading.Lock()
+
+
+def _rules_digest(rules_list):
+    """Return a stable hex digest identifying a list of rule JSON objects
+    as translated by the current translate_rules_to_clp."""
+    blob = json.dumps([_TRANSLATOR_VERSION, rules_list], sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def _compile_condition(c):
+    """Compile one JSON condition into a predicate over a normalized patient.
+
+    Mirrors the LHS patterns emitted by translate_rules_to_clp; conditions the
+    translator skips return None so both paths agree on what matches.
+    Symptom conditions are handled by compile_rules as a bitmask (see
+    _symptom_condition_symbol) and never reach here.
+    """
+    f = c.get('field')
+    op = c.get('operator')
+    v = c.get('value')
+    if f == 'age' and op in _AGE_OPS:
+        cmp = _AGE_OPS[op]
+        limit = int(v)
+        return lambda p: p['age'] is not None and cmp(p['age'], limit)
+    if f == 'history' and op in ('=', 'contains'):
+        val = str(v).translate(_SYMBOL_TABLE)
+        return lambda p: p['history'] == val
+    return None
+
+
+def _symptom_condition_symbol(c):
+    """Return the symptom symbol a condition requires, or None if it isn't one."""
+    if c.get('field') == 'symptom' and c.get('operator') in ('contains', '=', 'in'):
+        return str(c.get('value')).translate(_SYMBOL_TABLE)
+    return None
+
+
+def _symptom_bit(symbol):
+    with _SYMPTOM_BITS_LOCK:
+        bit = _SYMPTOM_BITS.get(symbol)
+        if bit is None:
+            bit = _SYMPTOM_BITS[symbol] = 1 << len(_SYMPTOM_BITS)
+        return bit
+
+
+def _symptom_mask(symbols):
+    """OR of the bits of the known symbols; unknown ones match no rule."""
+    mask = 0
+    for s in symbols:
+        mask |= _SYMPTOM_BITS.get(s, 0)
+    return mask
+
+
+def _compile_actions(actions):
+    """Build the triage result dict a rule's RHS would assert."""
+    result = dict(_TRIAGE_RESULT_DEFAULTS)
+    for a in actions:
+        if 'set_triage_level' in a:
+            result['triage_level'] = str(a['set_triage_level']).strip().upper()
+        if 'set_transport' in a:
+            result['transport'] = str(a['set_transport']).strip().lower()
+        if 'set_rationale' in a:
+            result['rationale'] = _RE_WS.sub(' ', str(a['set_rationale'])).strip()
+    return result
+
+
+def compile_rules(rules_list):
+    """Compile rule JSON objects (same schema as translate_rules_to_clp) into
+    a list of callables ordered by descending salience.
+
+    Each callable takes a patient dict prepared by _normalize_patient and
+    returns the rule's triage result dict when all its conditions hold,
+    otherwise None. A rule's symptom conditions are folded into one
+    required-bits mask, checked with a single AND before any other
+    predicate runs.
+
+    Returns None when rules of equal salience would assert different
+    results: CLIPS breaks those ties by activation recency, which depends on
+    the order facts were asserted, so only the CLIPS path can answer them.
+    """
+    compiled = []
+    results_by_salience = {}
+    for r in rules_list:
+        required = 0
+        preds = []
+        for c in r.get('conditions', []):
+            symbol = _symptom_condition_symbol(c)
+            if symbol is not None:
+                required |= _symptom_bit(symbol)
+                continue
+            pred = _compile_condition(c)
+            if pred is not None:
+                preds.append(pred)
+        preds = tuple(preds)
+        result = _compile_actions(r.get('actions', []))
+
+        def rule(p, required=required, preds=preds, result=result):
+            if (p['_sym_mask'] & required) == required and all(pred(p) for pred in preds):
+                return result
+            return None
+
+        salience = int(r.get('salience', 10))
+        if results_by_salience.setdefault(salience, result) != result:
+            return None
+        compiled.append((salience, rule))
+    # Ties left here all assert the same result, so their order doesn't matter
+    compiled.sort(key=lambda item: -item[0])
+    return [rule for _, rule in compiled]
+
+
+def _published_digest():
+    """Return the rules digest stamped in the active rules.clp, or None."""
+    try:
+        with open(_rules_path) as f:
+            header = f.readline()
+            digest_line = f.readline()
+    except OSError:
+        return None
+    if header != _GENERATED_HEADER or not digest_line.startswith(_DIGEST_PREFIX):
+        return None
+    return digest_line[len(_DIGEST_PREFIX):].strip()
+
+
+def _load_compiled_rules():
+    """Compile the DB rules if they are exactly what rules.clp was published from."""
+    global _COMPILED_RULES
+    _COMPILED_RULES = None
+    try:
+        published = _published_digest()
+        if published is None:
+            return
+        rules_json = [r['rule'] for r in db.list_rules() if r.get('rule')]
+        if rules_json and published == _rules_digest(rules_json):
+            _COMPILED_RULES = compile_rules(rules_json)
+            if _COMPILED_RULES is None:
+                logging.info('Published rules tie on salience with different results; using CLIPS only')
+            else:
+                logging.info(f'Compiled {len(_COMPILED_RULES)} published rules for fast triage')
+    except Exception:
+        logging.exception('Failed to compile published rules; using CLIPS only')
+
+
+_load_compiled_rules()
 
 
 @app.route('/api/publish-rules', methods=['POST'])
 def api_publish_rules():
     """Translate rules from DB to CLP, validate by loading in a temp CLIPS env, and if ok replace the active rules.clp."""
     try:
-        rules = db.list_rules()
+        rules = db.get_cached('rules')
         rules_json = [r['rule'] for r in rules if r.get('rule')]
         if not rules_json:
             return jsonify({'error': 'no rules to publish'}), 400
 
-        clp_text = translate_rules_to_clp(rules_json)
+        # Re-publishing the rule set that is already active is a no-op
+        digest = _rules_digest(rules_json)
+        if digest == _published_digest():
+            return jsonify({'status': 'ok', 'cached': True})
+
+        clp_text = _CLP_CACHE.get(digest)
+        if clp_text is None:
+            clp_text = translate_rules_to_clp(rules_json)
+            if len(_CLP_CACHE) >= _CLP_CACHE_MAX:
+                _CLP_CACHE.clear()
+            _CLP_CACHE[digest] = clp_text
         kb_dir = os.path.join(os.path.dirname(__file__), 'knowledge_base')
         temp_path = os.path.join(kb_dir, 'user_rules_temp.clp')
         final_path = os.path.join(kb_dir, 'rules.clp')
@@ -276,7 +574,8 @@ def api_publish_rules():
 
         # write temp CLP
         with open(temp_path, 'w') as f:
-            f.write(';; Generated by admin publish\n')
+            f.write(_GENERATED_HEADER)
+            f.write(_DIGEST_PREFIX + digest + '\n')
             f.write(clp_text)
 
         # Validate by loading into a fresh clips.Environment
@@ -299,17 +598,17 @@ def api_publish_rules():
             logging.exception('Failed to replace rules file')
             return jsonify({'error': 'failed to replace rules file', 'details': str(e)}), 500
 
-        # Reload global CLIPS_ENV: clear and load templates+rules
+        # Invalidate the per-thread environments so they pick up the new rules
+        global _KB_GENERATION
+        _KB_GENERATION += 1
+
+        # The published file now reflects rules_json; refresh the fast path
+        global _COMPILED_RULES
         try:
-            if hasattr(CLIPS_ENV, 'clear'):
-                CLIPS_ENV.clear()
-            # reload files
-            if os.path.isfile(_templates_path):
-                CLIPS_ENV.load(_templates_path)
-            if os.path.isfile(final_path):
-                CLIPS_ENV.load(final_path)
+            _COMPILED_RULES = compile_rules(rules_json)
         except Exception:
-            logging.exception('Failed to reload CLIPS_ENV after publish')
+            _COMPILED_RULES = None
+            logging.exception('Failed to compile published rules; using CLIPS only')
 
         return jsonify({'status': 'ok'})
     except Exception as e:
@@ -317,13 +616,84 @@ def api_publish_rules():
         return jsonify({'error': str(e)}), 500
 
 
+def _normalize_symptoms(data):
+    """Return the patient's symptoms as normalized symbol tokens.
+
+    Accepts a list or comma-separated string under `symptoms`, `symptom`
+    or `symptoms_list`. Each token is mapped through the DB synonyms
+    lookup when available; otherwise it is lowercased and has spaces
+    turned into hyphens (e.g. "Chest Pain" -> chest-pain).
+    """
+    symptoms = data.get('symptoms') or data.get('symptom') or data.get('symptoms_list')
+    sym_list = []
+    if symptoms is not None:
+        if isinstance(symptoms, str):
+            # allow comma-separated symptoms
+            for s in [s.strip() for s in symptoms.split(',') if s.strip()]:
+                sym_list.append(s)
+        elif isinstance(symptoms, list):
+            for s in symptoms:
+                if isinstance(s, str) and s.strip():
+                    sym_list.append(s.strip())
+
+    # Use DB synonyms lookup when available, one query for all symptoms
+    try:
+        mapping = db.lookup_symptoms(sym_list)
+    except Exception:
+        logging.exception('Symptom synonym lookup failed')
+        mapping = {}
+
+    # normalize symptom to symbol form (lowercase, spaces to hyphens); known
+    # symptoms come back from the DB already normalized
+    tokens = []
+    for s in sym_list:
+        token = str(s).strip().lower()
+        tokens.append(mapping.get(token) or token.translate(_SYMBOL_TABLE))
+    return tokens
+
+
+def _normalize_patient(data):
+    """Prepare the patient dict consumed by compiled rules.
+
+    Values are normalized exactly as assert_patient_facts would assert them,
+    with symptoms folded into the `_sym_mask` bitmask compiled rules test.
+    """
+    age = data.get('age')
+    if age is not None:
+        age = int(age)
+    elif data.get('gender') is not None:
+        # A patient-demographics fact is still asserted for gender alone and
+        # its INTEGER age slot then defaults to 0
+        age = 0
+    history = data.get('history')
+    if history is not None:
+        history = str(history).strip().translate(_SYMBOL_TABLE) or None
+    return {
+        'age': age,
+        'history': history,
+        '_sym_mask': _symptom_mask(_normalize_symptoms(data)),
+    }
+
+
+def _evaluate_compiled_rules(compiled, data):
+    """Return the triage result of the first matching compiled rule."""
+    patient = _normalize_patient(data)
+    for rule in compiled:
+        result = rule(patient)
+        if result is not None:
+            return dict(result)
+    return dict(_DEFAULT_TRIAGE_RESULT)
+
+
 def assert_patient_facts(env, data):
     """Assert patient facts into the provided CLIPS environment.
 
     We assert each incoming key/value as a separate CLIPS fact to avoid
     requiring a specific deftemplate. For example, {'age':70,'history':'diabetes'}
     becomes the facts (age 70) and (history diabetes).
-    Strings are quoted if they contain spaces.
+    Strings are quoted if they contain spaces. When every value is a plain
+    symbol all facts are submitted in a single (progn (assert ...) ...)
+    eval; otherwise each fact goes through its own assert_string.
     """
     if not isinstance(data, dict):
         raise TypeError("patient data must be a JSON object/dict")
@@ -335,6 +705,9 @@ def assert_patient_facts(env, data):
     # handled in a later stage.
     # patient-demographics
     pd_slots = []
+    # Every non-integer slot value, so the batched eval below can be limited
+    # to input that cannot be anything but a symbol
+    values = []
     age = data.get('age')
     if age is not None:
         pd_slots.append(f"(age {int(age)})")
@@ -346,11 +719,13 @@ def assert_patient_facts(env, data):
             g_val = '"' + g.replace('"', '\\"') + '"'
         else:
             g_val = g
+        values.append(g_val)
         pd_slots.append(f"(gender {g_val})")
 
+    facts = []
     if pd_slots:
         pd_fact = "(patient-demographics " + " ".join(pd_slots) + ")"
-        env.assert_string(pd_fact)
+        facts.append(pd_fact)
 
     # patient-history
     ph_slots = []
@@ -359,7 +734,8 @@ def assert_patient_facts(env, data):
         # history is defined as a SYMBOL in the template; convert spaces to hyphens
         h_raw = str(history).strip()
         if h_raw:
-            h = h_raw.replace(' ', '-')
+            h = h_raw.translate(_SYMBOL_TABLE)
+            values.append(h)
             ph_slots.append(f"(history {h})")
     moa = data.get('mode-of-arrival') or data.get('mode_of_arrival') or data.get('modeOfArrival')
     if moa is not None:
@@ -369,39 +745,37 @@ def assert_patient_facts(env, data):
                 m_val = '"' + m.replace('"', '\\"') + '"'
             else:
                 m_val = m
+            values.append(m_val)
             ph_slots.append(f"(mode-of-arrival {m_val})")
 
     if ph_slots:
         ph_fact = "(patient-history " + " ".join(ph_slots) + ")"
-        env.assert_string(ph_fact)
-
-    # symptoms: accept list or comma-separated string
-    symptoms = data.get('symptoms') or data.get('symptom') or data.get('symptoms_list')
-    sym_list = []
-    if symptoms is not None:
-        if isinstance(symptoms, str):
-            # allow comma-separated symptoms
-            for s in [s.strip() for s in symptoms.split(',') if s.strip()]:
-                sym_list.append(s)
-        elif isinstance(symptoms, list):
-            for s in symptoms:
-                if isinstance(s, str) and s.strip():
-                    sym_list.append(s.strip())
-
-    for s in sym_list:
-        # normalize symptom to symbol form (lowercase, spaces to hyphens)
-        # Use DB synonyms lookup when available
-        token = str(s).strip().lower()
-        mapped = None
+        facts.append(ph_fact)
+
+    symptoms = _normalize_symptoms(data)
+    # patient-symptom facts: (patient-symptom (name chest-pain))
+    facts.extend(f"(patient-symptom (name {sn}))" for sn in symptoms)
+    if not facts:
+        return
+
+    # Submit every fact in one eval so we cross into CLIPS once per request.
+    # eval runs arbitrary expressions, so this is only done when each value
+    # is a plain symbol; anything else (parentheses, quotes, tabs, quoted
+    # strings) takes the per-fact assert_string path, which parses exactly
+    # one fact
+    if all(_CLIPS_SYMBOL.fullmatch(v) for v in values + symptoms):
         try:
-            mapped = db.lookup_symptom(token)
+            env.eval("(progn " + " ".join(f"(assert {f})" for f in facts) + ")")
+            return
         except Exception:
-            mapped = None
-        if mapped:
-            sn = str(mapped).lower().replace(' ', '-')
-        else:
-            sn = token.replace(' ', '-')
-        # assert a patient-symptom fact: (patient-symptom (name chest-pain))
+            # e.g. a slot type mismatch; start over fact by fact so the
+            # offending fact is retried (or reported) on its own
+            logging.debug("Batched assert failed; asserting facts one by one")
+            env.reset()
+
+    for f in facts[:len(facts) - len(symptoms)]:
+        env.assert_string(f)
+    for sn in symptoms:
         try:
             env.assert_string(f"(patient-symptom (name {sn}))")
         except Exception:
@@ -410,10 +784,33 @@ def assert_patient_facts(env, data):
             env.assert_string(f"(patient-symptom (name {safe}))")
 
 
+# Fallback parsers for (triage-result ...) facts whose slots can't be read directly
+_RE_LEVEL = re.compile(r'\(level\s+([A-Za-z0-9_\-]+)\)')
+_RE_RATIONALE = re.compile(r'\(rationale\s+"([^\"]*)"\)')
+_RE_SCORE = re.compile(r'\(score\s+([0-9]+)\)')
+_RE_TRANSPORT = re.compile(r'\(transport\s+([A-Za-z0-9_\-]+)\)')
+
+_TRIAGE_SLOTS = ('level', 'rationale', 'score', 'transport')
+
+
 def _extract_triage_result(env):
-    """Scan the environment facts and return a dict with triage_level and rationale
-    if a (triage-result ...) fact is found. Returns None if not found.
+    """Return a dict with triage_level and rationale from the first
+    (triage-result ...) fact in the environment. Returns None if not found.
+
+    Only the triage-result template's own fact list is walked; the full
+    fact scan is kept as a fallback when the template can't be looked up.
     """
+    try:
+        facts = env.find_template('triage-result').facts()
+    except Exception:
+        return _scan_triage_result(env)
+    for fact in facts:
+        return _triage_result_from_fact(fact)
+    return None
+
+
+def _scan_triage_result(env):
+    """Scan every fact in the environment for a (triage-result ...) fact."""
     for fact in env.facts():
         # Try to determine template name; fallback to string parsing
         try:
@@ -421,68 +818,179 @@ def _extract_triage_result(env):
         except Exception:
             tname = None
 
-        fs = str(fact)
-        if tname == 'triage-result' or fs.startswith('(triage-result'):
-            level = None
-            rationale = None
-            score = None
-            transport = None
-            # Try slot access (clipspy exposes fact[slot])
-            try:
-                level = fact['level']
-            except Exception:
-                pass
-            try:
-                rationale = fact['rationale']
-            except Exception:
-                pass
+        if tname is not None and tname != 'triage-result':
+            continue
+        fs = None
+        if tname is None:
+            fs = str(fact)
+            if not fs.startswith('(triage-result'):
+                continue
+        return _triage_result_from_fact(fact, fs)
+    return None
+
+
+def _triage_result_from_fact(fact, fs=None):
+    """Convert a triage-result fact into the API result dict."""
+    # Read slots directly (clipspy exposes fact[slot])
+    values = {}
+    for slot in _TRIAGE_SLOTS:
+        try:
+            values[slot] = fact[slot]
+        except Exception:
+            values[slot] = None
+    level = values['level']
+    rationale = values['rationale']
+    score = values['score']
+    transport = values['transport']
+
+    # Fallback to regex parse of the fact string only if a slot read failed
+    if (level is None) or (rationale is None) or (score is None):
+        if fs is None:
+            fs = str(fact)
+        m_level = _RE_LEVEL.search(fs)
+        m_r = _RE_RATIONALE.search(fs)
+        m_s = _RE_SCORE.search(fs)
+        m_t = _RE_TRANSPORT.search(fs)
+        if m_level:
+            level = level or m_level.group(1)
+        if m_r:
+            rationale = rationale or m_r.group(1)
+        if m_s:
             try:
-                score = fact['score']
+                score = score or int(m_s.group(1))
             except Exception:
                 pass
+        if m_t:
+            transport = transport or m_t.group(1)
+
+    # Normalize/clean values for API consumers
+    if isinstance(level, str):
+        level = level.strip().upper()
+    if isinstance(rationale, str):
+        # Normalize internal whitespace/newlines to single spaces for API consumers
+        rationale = _RE_WS.sub(' ', rationale).strip()
+
+    result = {'triage_level': level, 'rationale': rationale}
+    if score is not None:
+        try:
+            result['score'] = int(score)
+        except Exception:
+            pass
+    if transport is not None:
+        if isinstance(transport, str):
+            result['transport'] = transport.strip().lower()
+        else:
+            result['transport'] = transport
+    return result
+
+
+# Append-only JSON-lines logs written by /dispatch and /api/notify-hospital.
+# Records are encoded on the request thread and queued; one daemon writer per
+# file drains its queue and appends whatever has accumulated in one batch, so
+# requests never wait on disk IO. Only the writer touches the file, which
+# keeps lines from concurrent requests from interleaving.
+#
+# A writer that can't open or write its file records the error in
+# _LOG_ERRORS, and _append_log then refuses records for that file, so
+# callers report the failure instead of success, until a probe open succeeds
+# (tried at most every _LOG_RETRY_SECONDS). Queues are bounded for the same
+# reason.
+_LOG_DIR = os.path.dirname(__file__)
+_LOG_QUEUES = {}
+_LOG_THREADS = []
+_LOG_ERRORS = {}
+_LOG_LOCK = threading.Lock()
+_LOG_STOP = object()
+_LOG_QUEUE_MAX = 10000
+_LOG_RETRY_SECONDS = 5
+
+
+def _log_writer(filename, q):
+    """Drain `q` into `filename` in the app directory until the stop sentinel arrives."""
+    path = os.path.join(_LOG_DIR, filename)
+    fh = None
+    try:
+        while True:
+            lines = [q.get()]
+            while True:
+                try:
+                    lines.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = _LOG_STOP in lines
             try:
-                transport = fact['transport']
-            except Exception:
-                pass
+                if fh is None:
+                    fh = open(path, 'a', encoding='utf-8')
+                fh.writelines(l for l in lines if l is not _LOG_STOP)
+                fh.flush()
+                _LOG_ERRORS.pop(filename, None)
+            except Exception as e:
+                logging.exception('Failed to write %s', path)
+                _LOG_ERRORS[filename] = (time.monotonic(), e)
+                if fh is not None:
+                    fh.close()
+                    fh = None
+            if stop:
+                return
+    finally:
+        if fh is not None:
+            fh.close()
+
+
+def _log_queue(filename):
+    q = _LOG_QUEUES.get(filename)
+    if q is None:
+        with _LOG_LOCK:
+            q = _LOG_QUEUES.get(filename)
+            if q is None:
+                q = queue.Queue(maxsize=_LOG_QUEUE_MAX)
+                t = threading.Thread(
+                    target=_log_writer,
+                    args=(filename, q),
+                    name=f'log-writer-{filename}',
+                    daemon=True,
+                )
+                t.start()
+                _LOG_THREADS.append(t)
+                _LOG_QUEUES[filename] = q
+    return q
+
+
+def _append_log(filename, record):
+    """Queue one JSON record to be appended as a line to a log file in the app directory.
+
+    Raises OSError when the file's last write failed or its queue is full.
+    """
+    failed = _LOG_ERRORS.get(filename)
+    if failed is not None:
+        failed_at, error = failed
+        if time.monotonic() - failed_at < _LOG_RETRY_SECONDS:
+            raise OSError(f'{filename} is not writable: {error}')
+        try:
+            open(os.path.join(_LOG_DIR, filename), 'a', encoding='utf-8').close()
+        except OSError as e:
+            _LOG_ERRORS[filename] = (time.monotonic(), e)
+            raise
+        _LOG_ERRORS.pop(filename, None)
+    line = _dumps(record)
+    if isinstance(line, bytes):
+        line = line.decode('utf-8')
+    try:
+        _log_queue(filename).put_nowait(line + '\n')
+    except queue.Full:
+        raise OSError(f'{filename} write queue is full') from None
 
-            # Fallback to regex parse of the fact string
-            if (level is None) or (rationale is None) or (score is None):
-                m_level = re.search(r'\(level\s+([A-Za-z0-9_\-]+)\)', fs)
-                m_r = re.search(r'\(rationale\s+"([^\"]*)"\)', fs)
-                m_s = re.search(r'\(score\s+([0-9]+)\)', fs)
-                m_t = re.search(r'\(transport\s+([A-Za-z0-9_\-]+)\)', fs)
-                if m_level:
-                    level = level or m_level.group(1)
-                if m_r:
-                    rationale = rationale or m_r.group(1)
-                if m_s:
-                    try:
-                        score = score or int(m_s.group(1))
-                    except Exception:
-                        pass
-                if m_t:
-                    transport = transport or m_t.group(1)
-
-            # Normalize/clean values for API consumers
-            if isinstance(level, str):
-                level = level.strip().upper()
-            if isinstance(rationale, str):
-                # Normalize internal whitespace/newlines to single spaces for API consumers
-                rationale = re.sub(r'\s+', ' ', rationale).strip()
-
-            result = {'triage_level': level, 'rationale': rationale}
-            if score is not None:
-                try:
-                    result['score'] = int(score)
-                except Exception:
-                    pass
-            if transport is not None:
-                if isinstance(transport, str):
-                    result['transport'] = transport.strip().lower()
-                else:
-                    result['transport'] = transport
-            return result
-    return None
+
+@atexit.register
+def _close_logs():
+    """Flush queued log lines and stop the writer threads."""
+    with _LOG_LOCK:
+        for q in _LOG_QUEUES.values():
+            q.put(_LOG_STOP)
+        for t in _LOG_THREADS:
+            t.join(timeout=5)
+        _LOG_QUEUES.clear()
+        _LOG_THREADS.clear()
 
 
 @app.route('/dispatch', methods=['POST'])
@@ -509,9 +1017,7 @@ def dispatch():
     }
 
     try:
-        log_path = os.path.join(os.path.dirname(__file__), 'alerts.log')
-        with open(log_path, 'a') as f:
-            f.write(json.dumps(alert) + '\n')
+        _append_log('alerts.log', alert)
     except Exception as e:
         logging.exception('Failed to write alert')
         return jsonify({'error': 'failed to record alert', 'details': str(e)}), 500
@@ -524,17 +1030,32 @@ def triage():
     """Main triage endpoint.
 
     Expects a JSON object with patient facts (e.g., {"age":70, "history":"diabetes"}).
-    Clones the preloaded CLIPS environment, asserts the facts into the cloned
-    environment, runs inference, extracts a (triage-result ...) fact, and
-    returns the triage level and rationale.
+    When the active rules were published from the DB, they are evaluated via
+    their precompiled Python form. Otherwise checks a CLIPS environment out
+    of the shared pool, asserts the facts, runs inference, extracts a (triage-result ...)
+    fact, and returns the triage level and rationale.
     """
     data = request.get_json(force=True)
     if not isinstance(data, dict):
         return jsonify({'error': 'invalid JSON body, expected object'}), 400
 
-    env = None
+    compiled = _COMPILED_RULES
+    if compiled is not None:
+        # Published DB rules: evaluate the precompiled predicates directly
+        try:
+            return _json_response(_evaluate_compiled_rules(compiled, data))
+        except Exception as e:
+            logging.exception("Failed to evaluate compiled rules")
+            return jsonify({'error': 'failed to assert facts', 'details': str(e)}), 500
+
+    checkout = None
     try:
-        env = _clone_environment()
+        try:
+            checkout = _checkout_environment()
+        except Exception as e:
+            logging.exception("Failed to prepare CLIPS environment")
+            return jsonify({'error': 'inference failure', 'details': str(e)}), 500
+        env = checkout[1]
 
         try:
             assert_patient_facts(env, data)
@@ -551,7 +1072,7 @@ def triage():
         result = _extract_triage_result(env)
         if not result:
             # If no triage-result, return a safe default instead of 500 so frontends can render gracefully.
-            return jsonify({
+            return _json_response({
                 'triage_level': 'GREEN',
                 'rationale': 'Default non-urgent triage (no rule matched).',
                 'score': 5,
@@ -570,25 +1091,10 @@ def triage():
             except Exception:
                 pass
 
-        return jsonify(normalized)
+        return _json_response(normalized)
     finally:
-        # Allow the temporary env to be cleaned up. Try some best-effort cleanup
-        # (clear/reset) before deleting reference.
-        try:
-            if env is not None:
-                if hasattr(env, 'clear'):
-                    try:
-                        env.clear()
-                    except Exception:
-                        pass
-                if hasattr(env, 'reset'):
-                    try:
-                        env.reset()
-                    except Exception:
-                        pass
-                del env
-        except Exception:
-            pass
+        if checkout is not None:
+            _return_environment(*checkout)
 
 
 @app.route('/api/hospitals', methods=['GET', 'POST'])
@@ -596,7 +1102,7 @@ def api_hospitals():
     """Manage hospitals"""
     if request.method == 'GET':
         try:
-            return jsonify(db.list_hospitals())
+            return _listing_response('hospitals')
         except Exception as e:
             logging.exception('Failed to list hospitals')
             return jsonify({'error': str(e)}), 500
@@ -634,7 +1140,10 @@ def api_nearest_hospitals():
         limit = int(payload.get('limit', 5))
         radius_km = float(payload.get('radius_km', 15))  # Default 15km radius
         
-        # Try to fetch from OpenStreetMap first (live data!)
+        # Try to fetch from OpenStreetMap first (live data!). location_service
+        # caches the hospitals around each ~100 m cell and re-ranks them from
+        # these exact coordinates, so repeated nearby requests stay cheap
+        # without returning another user's distances
         from location_service import find_nearby_hospitals
         
         logging.info(f"Searching for hospitals near {user_lat}, {user_lon} (radius: {radius_km}km)")
@@ -646,12 +1155,12 @@ def api_nearest_hospitals():
             for h in live_hospitals:
                 h['contact'] = h.get('phone', '')
                 h['rating'] = None  # OSM doesn't have ratings
-            return jsonify(live_hospitals)
+            return _json_response(live_hospitals)
         
         # Fallback to local database
         logging.info("No results from OSM, falling back to local database")
         nearest = db.find_nearest_hospitals(user_lat, user_lon, limit)
-        return jsonify(nearest)
+        return _json_response(nearest)
         
     except Exception as e:
         logging.exception('Failed to find nearest hospitals')
@@ -713,9 +1222,7 @@ def api_notify_hospital():
     
     try:
         # Log notification (in production, send via SMS/email/push)
-        log_path = os.path.join(os.path.dirname(__file__), 'hospital_notifications.log')
-        with open(log_path, 'a') as f:
-            f.write(json.dumps(notification) + '\n')
+        _append_log('hospital_notifications.log', notification)
         
         return jsonify({
             'status': 'ok',
@@ -749,7 +1256,39 @@ def api_geocode():
         return jsonify({'error': 'Geocoding service temporarily unavailable'}), 503
 
 
+# Upper bound on points per /api/reverse-geocode call; at Nominatim's 1 req/s
+# a full batch of uncached points already takes over a minute
+_MAX_REVERSE_BATCH = 100
+
+
+@app.route('/api/reverse-geocode', methods=['POST'])
+def api_reverse_geocode():
+    """Convert a batch of coordinates to addresses (cached, rate-limited)"""
+    payload = request.get_json(force=True)
+    points = payload.get('points')
+    
+    if not isinstance(points, list) or not points:
+        return jsonify({'error': 'points required'}), 400
+    if len(points) > _MAX_REVERSE_BATCH:
+        return jsonify({'error': f'at most {_MAX_REVERSE_BATCH} points per request'}), 400
+    try:
+        coords = [(float(p[0]), float(p[1])) for p in points]
+    except (TypeError, ValueError, IndexError, KeyError):
+        return jsonify({'error': 'points must be [lat, lon] pairs'}), 400
+    if not all(location_service.validate_coordinates(lat, lon) for lat, lon in coords):
+        return jsonify({'error': 'coordinates out of range'}), 400
+    
+    try:
+        addresses = location_service.reverse_geocode_many(coords)
+        return jsonify({'addresses': addresses}), 200
+    except Exception as e:
+        logging.exception(f"Batch reverse geocoding error: {e}")
+        return jsonify({'error': 'Geocoding service temporarily unavailable'}), 503
+
+
 if __name__ == '__main__':
-    # Simple runner for development
-    app.run(host='0.0.0.0', port=7000, debug=True)
+    # Development runner. The debugger/reloader is opt-in via FLASK_DEBUG=1;
+    # for production serve app:app with a WSGI server (see README).
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+    app.run(host='0.0.0.0', port=7000, debug=debug, threaded=True)
 
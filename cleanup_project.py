@@ -9,9 +9,14 @@ This script:
 4. Generates a project report
 """
 
+import mmap
 import os
 import shutil
+import stat
 import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict
 
 # Define redundant files to remove
 REDUNDANT_FILES = [
@@ -49,126 +54,8 @@ ESSENTIAL_FILES = [
 ]
 
 
-def print_header(text):
-    print("\n" + "="*70)
-    print(f"  {text}")
-    print("="*70)
-
-
-def verify_expert_system():
-    """Verify this is a proper CLIPS-based Expert System"""
-    print_header("EXPERT SYSTEM VERIFICATION")
-    
-    checks = {
-        'CLIPS Engine': False,
-        'Knowledge Base (rules.clp)': False,
-        'Templates (templates.clp)': False,
-        'Inference Engine': False,
-        'Production Rules': False
-    }
-    
-    # Check for CLIPS in requirements
-    if os.path.exists('requirements.txt'):
-        with open('requirements.txt', 'r') as f:
-            if 'clipspy' in f.read():
-                checks['CLIPS Engine'] = True
-    
-    # Check for knowledge base files
-    if os.path.exists('knowledge_base/rules.clp'):
-        checks['Knowledge Base (rules.clp)'] = True
-        
-        # Count rules
-        with open('knowledge_base/rules.clp', 'r') as f:
-            content = f.read()
-            rule_count = content.count('(defrule')
-            if rule_count > 0:
-                checks['Production Rules'] = True
-                print(f"  ✓ Found {rule_count} production rules")
-    
-    if os.path.exists('knowledge_base/templates.clp'):
-        checks['Templates (templates.clp)'] = True
-    
-    # Check for inference in app.py
-    if os.path.exists('app.py'):
-        with open('app.py', 'r') as f:
-            content = f.read()
-            if 'CLIPS_ENV.run()' in content or 'clips.run()' in content:
-                checks['Inference Engine'] = True
-    
-    # Print results
-    print("\nExpert System Components:")
-    for component, status in checks.items():
-        icon = "✓" if status else "✗"
-        print(f"  {icon} {component}")
-    
-    is_expert_system = all(checks.values())
-    
-    if is_expert_system:
-        print("\n✅ THIS IS A VALID CLIPS-BASED EXPERT SYSTEM")
-        print("   - Uses forward-chaining inference")
-        print("   - Has declarative knowledge base (rules)")
-        print("   - Separates knowledge from control")
-    else:
-        print("\n⚠️  Missing some expert system components")
-    
-    return is_expert_system
-
-
-def cleanup_files():
-    """Remove redundant files"""
-    print_header("CLEANING UP REDUNDANT FILES")
-    
-    removed = []
-    skipped = []
-    
-    for file_path in REDUNDANT_FILES:
-        full_path = os.path.join(os.getcwd(), file_path)
-        
-        if os.path.exists(full_path):
-            try:
-                if os.path.isfile(full_path):
-                    os.remove(full_path)
-                elif os.path.isdir(full_path):
-                    shutil.rmtree(full_path)
-                removed.append(file_path)
-                print(f"  ✓ Removed: {file_path}")
-            except Exception as e:
-                skipped.append((file_path, str(e)))
-                print(f"  ✗ Failed to remove {file_path}: {e}")
-        else:
-            print(f"  - Already gone: {file_path}")
-    
-    print(f"\n  Removed {len(removed)} files/directories")
-    return removed, skipped
-
-
-def verify_essential_files():
-    """Verify all essential files exist"""
-    print_header("VERIFYING ESSENTIAL FILES")
-    
-    missing = []
-    
-    for file_path in ESSENTIAL_FILES:
-        full_path = os.path.join(os.getcwd(), file_path)
-        if os.path.exists(full_path):
-            print(f"  ✓ {file_path}")
-        else:
-            print(f"  ✗ MISSING: {file_path}")
-            missing.append(file_path)
-    
-    if missing:
-        print(f"\n⚠️  {len(missing)} essential files are missing!")
-    else:
-        print("\n✅ All essential files present")
-    
-    return missing
-
-
-def create_project_structure_doc():
-    """Create a clean project structure document"""
-    print_header("GENERATING PROJECT STRUCTURE")
-    
-    structure = """# Medical Triage Expert System - Project Structure
+# Contents of the generated PROJECT_STRUCTURE.md, encoded once
+_PROJECT_STRUCTURE_MD = """# Medical Triage Expert System - Project Structure
 
 ## 🏗️ Architecture
 
@@ -284,30 +171,273 @@ Expertsystem-medical-symptom-traige/
 - `static/simple.html`
 - `data.db`, `requirements.txt`
 - `README.md`
-"""
+""".encode('utf-8')
+
+
+_RULES_PATH = 'knowledge_base/rules.clp'
+
+
+def _mapped(path):
+    """Open `path` as a read-only mmap, or return None if it is missing or empty."""
+    try:
+        with open(path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # ValueError: empty file can't be mapped
+        return None
+
+
+def _contains(path, *needles):
+    """True if the file contains any of `needles`, scanning it without reading it into memory."""
+    m = _mapped(path)
+    if m is None:
+        return False
+    with m:
+        return any(m.find(n) != -1 for n in needles)
+
+
+def _count(path, needle):
+    """Number of non-overlapping occurrences of `needle` in the file."""
+    m = _mapped(path)
+    if m is None:
+        return 0
+    n = 0
+    with m:
+        pos = m.find(needle)
+        while pos != -1:
+            n += 1
+            pos = m.find(needle, pos + len(needle))
+    return n
+
+
+@dataclass
+class ProjectState:
+    """Everything the phases below need to know about the project tree.
+
+    Built once by scan(): a single scandir walk records each entry's
+    is-directory flag from the directory read itself (d_type, no stat), and
+    the marker checks on the few files the phases look inside are run once
+    over memory maps. Paths whose size or
+    mode is needed are lstat()ed lazily into `stats`. cleanup_files and
+    create_project_structure_doc keep the index in sync via forget/record.
+    """
+    tree: Dict[str, bool]
+    clipspy_required: bool
+    inference_found: bool
+    rule_count: int
+    stats: Dict[str, os.stat_result] = field(default_factory=dict)
+
+    @classmethod
+    def scan(cls):
+        """Index the current directory."""
+        tree = {}
+        stack = ['.']
+        while stack:
+            top = stack.pop()
+            try:
+                with os.scandir(top) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        tree[os.path.normpath(entry.path)] = is_dir
+                        if is_dir:
+                            stack.append(entry.path)
+            except OSError:
+                pass
+
+        def present(path):
+            return os.path.normpath(path) in tree
+
+        return cls(
+            tree=tree,
+            clipspy_required=present('requirements.txt') and _contains('requirements.txt', b'clipspy'),
+            inference_found=present('app.py') and _contains('app.py', b'CLIPS_ENV.run()', b'clips.run()'),
+            rule_count=_count(_RULES_PATH, b'(defrule') if present(_RULES_PATH) else 0,
+        )
+
+    @property
+    def present(self):
+        return self.tree.keys()
+
+    @property
+    def dir_count(self):
+        return sum(self.tree.values())
+
+    @property
+    def file_count(self):
+        return len(self.tree) - self.dir_count
+
+    @property
+    def db_size(self):
+        st = self.lstat('data.db')
+        return st.st_size if st is not None else 0
+
+    def exists(self, path):
+        return os.path.normpath(path) in self.tree
+
+    def lstat(self, path):
+        """Cached lstat for a project-relative path, or None if it doesn't exist."""
+        path = os.path.normpath(path)
+        if path not in self.tree:
+            return None
+        st = self.stats.get(path)
+        if st is None:
+            try:
+                st = self.stats[path] = os.lstat(path)
+            except OSError:
+                return None
+        return st
+
+    def forget(self, path):
+        """Drop a removed path (and anything below it) from the index."""
+        path = os.path.normpath(path)
+        prefix = path + os.sep
+        for key in [k for k in self.tree if k == path or k.startswith(prefix)]:
+            del self.tree[key]
+            self.stats.pop(key, None)
+
+    def record(self, path):
+        """Add a newly written file to the index."""
+        self.tree[os.path.normpath(path)] = False
+
+
+def print_header(text):
+    print("\n" + "="*70)
+    print(f"  {text}")
+    print("="*70)
+
+
+def verify_expert_system(state):
+    """Verify this is a proper CLIPS-based Expert System"""
+    print_header("EXPERT SYSTEM VERIFICATION")
+    
+    checks = {
+        'CLIPS Engine': False,
+        'Knowledge Base (rules.clp)': False,
+        'Templates (templates.clp)': False,
+        'Inference Engine': False,
+        'Production Rules': False
+    }
+    
+    # Check for CLIPS in requirements
+    if state.clipspy_required:
+        checks['CLIPS Engine'] = True
+    
+    # Check for knowledge base files
+    if state.exists(_RULES_PATH):
+        checks['Knowledge Base (rules.clp)'] = True
+        
+        # Count rules
+        rule_count = state.rule_count
+        if rule_count > 0:
+            checks['Production Rules'] = True
+            print(f"  ✓ Found {rule_count} production rules")
+    
+    if state.exists('knowledge_base/templates.clp'):
+        checks['Templates (templates.clp)'] = True
+    
+    # Check for inference in app.py
+    if state.inference_found:
+        checks['Inference Engine'] = True
+    
+    # Print results
+    print("\nExpert System Components:")
+    for component, status in checks.items():
+        icon = "✓" if status else "✗"
+        print(f"  {icon} {component}")
+    
+    is_expert_system = all(checks.values())
+    
+    if is_expert_system:
+        print("\n✅ THIS IS A VALID CLIPS-BASED EXPERT SYSTEM")
+        print("   - Uses forward-chaining inference")
+        print("   - Has declarative knowledge base (rules)")
+        print("   - Separates knowledge from control")
+    else:
+        print("\n⚠️  Missing some expert system components")
+    
+    return is_expert_system
+
+
+def cleanup_files(state):
+    """Remove redundant files"""
+    print_header("CLEANING UP REDUNDANT FILES")
     
-    with open('PROJECT_STRUCTURE.md', 'w') as f:
-        f.write(structure)
+    removed = []
+    skipped = []
+    
+    for file_path in REDUNDANT_FILES:
+        full_path = os.path.join(os.getcwd(), file_path)
+        st = state.lstat(file_path)
+        
+        # Branch on the lstat mode bits; symlinks are unlinked, never followed
+        if st is None:
+            print(f"  - Already gone: {file_path}")
+            continue
+        try:
+            if stat.S_ISDIR(st.st_mode):
+                shutil.rmtree(full_path)
+            elif stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode):
+                os.remove(full_path)
+            else:
+                raise OSError('not a regular file or directory')
+        except FileNotFoundError:
+            # removed since the tree was walked
+            state.forget(file_path)
+            print(f"  - Already gone: {file_path}")
+            continue
+        except Exception as e:
+            skipped.append((file_path, str(e)))
+            print(f"  ✗ Failed to remove {file_path}: {e}")
+            continue
+        state.forget(file_path)
+        removed.append(file_path)
+        print(f"  ✓ Removed: {file_path}")
+    
+    print(f"\n  Removed {len(removed)} files/directories")
+    return removed, skipped
+
+
+def verify_essential_files(state):
+    """Verify all essential files exist"""
+    print_header("VERIFYING ESSENTIAL FILES")
+    
+    missing = []
+    
+    for file_path in ESSENTIAL_FILES:
+        if state.exists(file_path):
+            print(f"  ✓ {file_path}")
+        else:
+            print(f"  ✗ MISSING: {file_path}")
+            missing.append(file_path)
+    
+    if missing:
+        print(f"\n⚠️  {len(missing)} essential files are missing!")
+    else:
+        print("\n✅ All essential files present")
+    
+    return missing
+
+
+def create_project_structure_doc(state):
+    """Create a clean project structure document"""
+    print_header("GENERATING PROJECT STRUCTURE")
+    
+    Path('PROJECT_STRUCTURE.md').write_bytes(_PROJECT_STRUCTURE_MD)
+    state.record('PROJECT_STRUCTURE.md')
     
     print("  ✓ Created PROJECT_STRUCTURE.md")
 
 
-def generate_report():
+def generate_report(state):
     """Generate final cleanup report"""
     print_header("FINAL PROJECT STATUS")
     
-    # Count files
-    file_count = sum(len(files) for _, _, files in os.walk('.'))
-    dir_count = sum(len(dirs) for _, dirs, _ in os.walk('.'))
-    
-    # Check database
-    db_size = os.path.getsize('data.db') if os.path.exists('data.db') else 0
-    
-    # Check knowledge base
-    rules_count = 0
-    if os.path.exists('knowledge_base/rules.clp'):
-        with open('knowledge_base/rules.clp', 'r') as f:
-            rules_count = f.read().count('(defrule')
+    file_count = state.file_count
+    dir_count = state.dir_count
+    db_size = state.db_size
+    rules_count = state.rule_count
     
     print(f"""
 Project Statistics:
@@ -329,20 +459,23 @@ def main():
     # Change to project directory
     os.chdir('/home/dkmbugua/Expertsystem-medical-symptom-traige')
     
+    # Scan the tree and read the checked files once for every phase
+    state = ProjectState.scan()
+    
     # 1. Verify it's an expert system
-    is_expert = verify_expert_system()
+    is_expert = verify_expert_system(state)
     
     # 2. Clean up redundant files
-    removed, skipped = cleanup_files()
+    removed, skipped = cleanup_files(state)
     
     # 3. Verify essential files
-    missing = verify_essential_files()
+    missing = verify_essential_files(state)
     
     # 4. Create project structure doc
-    create_project_structure_doc()
+    create_project_structure_doc(state)
     
     # 5. Generate report
-    generate_report()
+    generate_report(state)
     
     print_header("CLEANUP COMPLETE")
     
@@ -1,26 +1,284 @@
 import os
+import math
 import sqlite3
 import json
+import threading
+import functools
+import contextlib
+import atexit
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON for the synonym/symptom/rule columns
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+else:
+    _loads = json.loads
+    # Same compact output as orjson: no spaces after ',' and ':'
+    _dumps = functools.partial(json.dumps, separators=(',', ':'))
+
+try:
+    import numpy as np
+except ImportError:  # optional: vectorized nearest-hospital search
+    np = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional: compiled distance kernel on top of numpy
+    njit = None
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'data.db')
 
+# One long-lived connection per thread, opened on first use and reused for
+# every call on that thread; connections are never shared across threads, so
+# sqlite3's same-thread check stays on. In WAL mode (set by init_db) readers
+# on different threads don't block each other or a writer; _WRITE_LOCK
+# queues writers in-process instead of letting them contend for SQLite's
+# file lock.
+_LOCAL = threading.local()
+_WRITE_LOCK = threading.Lock()
+
+
+# Per-table write generations. Every committed write bumps its table so the
+# cached listings below are recomputed on the next read.
+_GEN = {'symptoms': 0, 'diseases': 0, 'rules': 0, 'hospitals': 0}
+
+
+def generation(table):
+    """Return the current write generation of a table."""
+    return _GEN[table]
+
+
+# Symptom names are stored alongside their CLIPS symbol form
+# (lowercase, spaces to hyphens) in symptoms.normalized
+_SYMBOL_TABLE = str.maketrans(' ', '-')
+
+
+def normalize_symptom(name):
+    """Return the CLIPS symbol form of a symptom name."""
+    return str(name).lower().translate(_SYMBOL_TABLE)
+
 
 def get_conn():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    """Return this thread's SQLite connection, opening it on first use."""
+    conn = getattr(_LOCAL, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, cached_statements=512)
+        conn.row_factory = sqlite3.Row
+        # Per-connection settings; journal_mode=WAL is persistent and set once in init_db
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=67108864')
+        _LOCAL.conn = conn
     return conn
 
 
+@atexit.register
+def _optimize():
+    """Refresh planner statistics from the exiting thread's connection.
+
+    Connections belong to their threads, so only the one opened by the
+    thread running atexit (the main thread) can be used here.
+    """
+    conn = getattr(_LOCAL, 'conn', None)
+    if conn is None:
+        return
+    try:
+        conn.execute('PRAGMA optimize')
+    except sqlite3.Error:
+        pass
+
+
+@contextlib.contextmanager
+def _writing(table):
+    """Run a write transaction on `table` and bump its generation on commit."""
+    conn = get_conn()
+    with _WRITE_LOCK:
+        with conn:
+            yield conn
+        _GEN[table] += 1
+
+
+def _json_merge(existing, new):
+    """SQL expression appending the items of JSON array `new` that aren't
+    already in `existing`, keeping first-seen order (like dict.fromkeys).
+    """
+    return f'''(SELECT json_group_array(value) FROM (
+            SELECT value FROM (
+                SELECT value, src, pos,
+                       row_number() OVER (PARTITION BY value ORDER BY src, pos) AS rn
+                FROM (SELECT value, 0 AS src, key AS pos FROM json_each({existing})
+                      UNION ALL
+                      SELECT value, 1, key FROM json_each({new}))
+            ) WHERE rn = 1 ORDER BY src, pos))'''
+
+
+def _json_array(column):
+    """SQL expression for JSON `column`, or an empty array if it isn't one."""
+    return (f"CASE WHEN json_valid({column}) AND json_type({column}) = 'array' "
+            f"THEN {column} ELSE '[]' END")
+
+
+def _expand_synonyms(row):
+    """SQL statement adding a symptom_synonyms row per synonym of `row`."""
+    return (f'INSERT INTO symptom_synonyms (symptom_id, position, synonym) '
+            f'SELECT {row}.id, key, value FROM json_each({_json_array(row + ".synonyms")});')
+
+
+def _expand_age_groups(row):
+    """SQL statement adding a symptom_age_groups row per age group id of `row`."""
+    return (f'INSERT OR IGNORE INTO symptom_age_groups (symptom_id, age_group_id) '
+            f'SELECT {row}.id, value FROM json_each({_json_array(row + ".age_groups")}) '
+            f"WHERE type = 'integer';")
+
+
+# SQL used by the helpers below. Every statement is a module constant so the
+# same string is passed on each call and the connection's statement cache
+# (see get_conn) hands back the already-prepared statement.
+_HOSPITAL_COLUMNS = 'id, name, latitude, longitude, contact, ambulance_available, capacity_level'
+
+_SQL_LIST_SYMPTOMS = 'SELECT id, name, synonyms, age_groups FROM symptoms ORDER BY name'
+# Symptoms without any age groups apply to every age, as in the UI filter
+_SQL_SYMPTOMS_FOR_AGE = '''
+SELECT id, name, synonyms, age_groups FROM symptoms s
+WHERE s.id IN (
+    SELECT sag.symptom_id FROM age_groups g
+    JOIN symptom_age_groups sag ON sag.age_group_id = g.id
+    WHERE ? BETWEEN g.min_age AND g.max_age
+) OR NOT EXISTS (SELECT 1 FROM symptom_age_groups x WHERE x.symptom_id = s.id)
+ORDER BY name
+'''
+_SQL_SYMPTOM_INDEX = '''
+SELECT s.id, s.name, s.normalized, ss.synonym
+FROM symptoms s LEFT JOIN symptom_synonyms ss ON ss.symptom_id = s.id
+ORDER BY s.id, ss.position
+'''
+_SQL_LIST_DISEASES = 'SELECT id, name, symptoms FROM diseases ORDER BY name'
+_SQL_INSERT_RULE = 'INSERT INTO rules (name, rule_json) VALUES (?, ?)'
+_SQL_UPDATE_RULE = 'UPDATE rules SET rule_json=? WHERE id=?'
+_SQL_LIST_RULES = 'SELECT id, name, rule_json FROM rules ORDER BY id'
+_SQL_GET_RULE = 'SELECT id, name, rule_json FROM rules WHERE id=?'
+_SQL_DELETE_RULE = 'DELETE FROM rules WHERE id=?'
+_SQL_INSERT_HOSPITAL = 'INSERT INTO hospitals (name, latitude, longitude, contact, ambulance_available, capacity_level) VALUES (?, ?, ?, ?, ?, ?)'
+_SQL_UPDATE_HOSPITAL = 'UPDATE hospitals SET latitude=?, longitude=?, contact=?, ambulance_available=?, capacity_level=? WHERE name=?'
+_SQL_LIST_HOSPITALS = f'SELECT {_HOSPITAL_COLUMNS} FROM hospitals ORDER BY name'
+_SQL_HOSPITALS_IN_BBOX = f'''
+SELECT {_HOSPITAL_COLUMNS} FROM hospitals
+WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?
+ORDER BY name
+'''
+
+# An existing symptom gets the new synonyms merged into its list
+_SQL_UPSERT_SYMPTOM = f'''
+INSERT INTO symptoms (name, synonyms, normalized) VALUES (?, json(?), ?)
+ON CONFLICT(name) DO UPDATE SET synonyms = {_json_merge('symptoms.synonyms', 'excluded.synonyms')}
+'''
+_SQL_UPSERT_SYMPTOM_RETURNING_ID = _SQL_UPSERT_SYMPTOM + 'RETURNING id'
+
+# An existing disease gets the new symptoms merged into its list
+_SQL_UPSERT_DISEASE = f'''
+INSERT INTO diseases (name, symptoms) VALUES (?, json(?))
+ON CONFLICT(name) DO UPDATE SET symptoms = {_json_merge('diseases.symptoms', 'excluded.symptoms')}
+'''
+_SQL_UPSERT_DISEASE_RETURNING_ID = _SQL_UPSERT_DISEASE + 'RETURNING id'
+
+# Existing hospitals (by name) are updated in place, as in add_hospital
+_SQL_UPSERT_HOSPITAL = '''
+INSERT INTO hospitals (name, latitude, longitude, contact, ambulance_available, capacity_level)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(name) DO UPDATE SET
+    latitude=excluded.latitude, longitude=excluded.longitude, contact=excluded.contact,
+    ambulance_available=excluded.ambulance_available, capacity_level=excluded.capacity_level
+'''
+
+
 def init_db():
     conn = get_conn()
+    # WAL lets readers proceed while a write is in progress; the mode is
+    # stored in the database file, so this covers every later connection
+    conn.execute('PRAGMA journal_mode=WAL')
     cur = conn.cursor()
     cur.execute('''
     CREATE TABLE IF NOT EXISTS symptoms (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         name TEXT UNIQUE NOT NULL,
-        synonyms TEXT DEFAULT '[]'
+        synonyms TEXT DEFAULT '[]',
+        age_groups TEXT DEFAULT '[]',
+        normalized TEXT
     )
     ''')
+    # Migrate tables created before these columns existed
+    for column in ("age_groups TEXT DEFAULT '[]'", 'normalized TEXT'):
+        try:
+            cur.execute(f'ALTER TABLE symptoms ADD COLUMN {column}')
+        except sqlite3.OperationalError:
+            pass  # column already exists
+    # Backfill rows written before the column existed or by the setup scripts
+    cur.execute("UPDATE symptoms SET normalized = replace(lower(name), ' ', '-') WHERE normalized IS NULL")
+    # One row per synonym, so the synonym index is built from plain rows
+    # instead of decoding every symptom's JSON list. Triggers keep it in
+    # step with symptoms.synonyms for every writer, including the scripts
+    # that write to symptoms directly.
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS symptom_synonyms (
+        symptom_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        synonym TEXT NOT NULL,
+        PRIMARY KEY (symptom_id, position)
+    ) WITHOUT ROWID
+    ''')
+    cur.executescript(f'''
+    CREATE TRIGGER IF NOT EXISTS symptoms_synonyms_ai AFTER INSERT ON symptoms BEGIN
+        {_expand_synonyms('new')}
+    END;
+    CREATE TRIGGER IF NOT EXISTS symptoms_synonyms_au AFTER UPDATE OF synonyms ON symptoms BEGIN
+        DELETE FROM symptom_synonyms WHERE symptom_id = old.id;
+        {_expand_synonyms('new')}
+    END;
+    CREATE TRIGGER IF NOT EXISTS symptoms_synonyms_ad AFTER DELETE ON symptoms BEGIN
+        DELETE FROM symptom_synonyms WHERE symptom_id = old.id;
+    END;
+    ''')
+    # Rebuild so rows written before the triggers existed are covered
+    cur.execute('DELETE FROM symptom_synonyms')
+    cur.execute(f'''
+    INSERT INTO symptom_synonyms (symptom_id, position, synonym)
+    SELECT s.id, j.key, j.value FROM symptoms s, json_each({_json_array('s.synonyms')}) j
+    ''')
+    # Same for the age groups a symptom applies to (ids into the age_groups
+    # table created by setup_age_stratified_system), indexed by age group so
+    # list_symptoms_for_age probes only the matching rows
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS symptom_age_groups (
+        symptom_id INTEGER NOT NULL,
+        age_group_id INTEGER NOT NULL,
+        PRIMARY KEY (symptom_id, age_group_id)
+    ) WITHOUT ROWID
+    ''')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_symptom_age_groups_group ON symptom_age_groups(age_group_id)')
+    cur.executescript(f'''
+    CREATE TRIGGER IF NOT EXISTS symptoms_age_groups_ai AFTER INSERT ON symptoms BEGIN
+        {_expand_age_groups('new')}
+    END;
+    CREATE TRIGGER IF NOT EXISTS symptoms_age_groups_au AFTER UPDATE OF age_groups ON symptoms BEGIN
+        DELETE FROM symptom_age_groups WHERE symptom_id = old.id;
+        {_expand_age_groups('new')}
+    END;
+    CREATE TRIGGER IF NOT EXISTS symptoms_age_groups_ad AFTER DELETE ON symptoms BEGIN
+        DELETE FROM symptom_age_groups WHERE symptom_id = old.id;
+    END;
+    ''')
+    cur.execute('DELETE FROM symptom_age_groups')
+    cur.execute(f'''
+    INSERT OR IGNORE INTO symptom_age_groups (symptom_id, age_group_id)
+    SELECT s.id, j.value FROM symptoms s, json_each({_json_array('s.age_groups')}) j
+    WHERE j.type = 'integer'
+    ''')
     cur.execute('''
     CREATE TABLE IF NOT EXISTS diseases (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -39,11 +297,23 @@ def init_db():
         capacity_level TEXT DEFAULT 'medium'
     )
     ''')
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS rules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE,
+        rule_json TEXT
+    )
+    ''')
+    # Range indexes for the bounding-box prefilter in find_nearest_hospitals
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_hosp_lat ON hospitals(latitude)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_hosp_lon ON hospitals(longitude)')
+    conn.commit()
+    # Give the planner sqlite_stat1 statistics so it picks the indexes above
+    cur.execute('ANALYZE')
     conn.commit()
-    conn.close()
 
 
-def add_symptom(name, synonyms=None):
+def _symptom_params(name, synonyms):
     if not name:
         raise ValueError('name required')
     
@@ -55,186 +325,262 @@ def add_symptom(name, synonyms=None):
         synonyms = [s.strip() for s in synonyms.split(',') if s.strip()]
     elif not isinstance(synonyms, list):
         synonyms = []
-    
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        cur.execute('INSERT INTO symptoms (name, synonyms) VALUES (?, ?)', (name, json.dumps(synonyms)))
-        conn.commit()
-        return cur.lastrowid
-    except sqlite3.IntegrityError:
-        # merge synonyms
-        cur.execute('SELECT synonyms FROM symptoms WHERE name=?', (name,))
-        row = cur.fetchone()
-        if row:
-            existing = json.loads(row['synonyms'])
-            merged = list(dict.fromkeys(existing + synonyms))
-            cur.execute('UPDATE symptoms SET synonyms=? WHERE name=?', (json.dumps(merged), name))
-            conn.commit()
-        return None
-    finally:
-        conn.close()
+    return (name, _dumps(synonyms), normalize_symptom(name))
+
+
+def add_symptom(name, synonyms=None):
+    params = _symptom_params(name, synonyms)
+    with _writing('symptoms') as conn:
+        return conn.execute(_SQL_UPSERT_SYMPTOM_RETURNING_ID, params).fetchone()[0]
+
+
+def add_symptoms_bulk(symptoms):
+    """Add or merge many symptoms in one transaction.
+
+    `symptoms` is an iterable of (name, synonyms) pairs or dicts with those
+    keys, accepting the same synonym formats as add_symptom. Returns the
+    number of rows written.
+    """
+    params = [
+        _symptom_params(*((s.get('name'), s.get('synonyms')) if isinstance(s, dict) else s))
+        for s in symptoms
+    ]
+    with _writing('symptoms') as conn:
+        conn.executemany(_SQL_UPSERT_SYMPTOM, params)
+    return len(params)
+
+
+# The iter_* functions yield rows straight off the cursor instead of building
+# the whole list first; list_* keep returning lists for existing callers.
+def _symptom_row(r):
+    return {
+        'id': r[0],
+        'name': r[1],
+        'synonyms': _loads(r[2]),
+        'age_groups': _loads(r[3]) if r[3] else []
+    }
+
+
+def iter_symptoms():
+    for r in get_conn().execute(_SQL_LIST_SYMPTOMS):
+        yield _symptom_row(r)
 
 
 def list_symptoms():
+    return list(iter_symptoms())
+
+
+def list_symptoms_for_age(age):
+    """Symptoms that apply at `age`, via the symptom_age_groups index.
+
+    Symptoms with no age groups are included for every age. The age_groups
+    table comes from setup_age_stratified_system; until that has run there
+    is nothing to filter by and every symptom is returned.
+    """
+    try:
+        rows = get_conn().execute(_SQL_SYMPTOMS_FOR_AGE, (int(age),)).fetchall()
+    except sqlite3.OperationalError as e:
+        if 'no such table: age_groups' not in str(e):
+            raise
+        return list_symptoms()
+    return [_symptom_row(r) for r in rows]
+
+
+@functools.lru_cache(maxsize=2)
+def _syn_index(gen):
+    """Map every lowercased symptom name and synonym to (name, normalized).
+
+    Rows are visited in id order and the first mapping for a token wins,
+    which is the precedence the old per-call table scan had.
+    """
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute('SELECT rowid, name, synonyms, age_groups FROM symptoms ORDER BY name')
-    rows = []
-    for r in cur.fetchall():
-        rows.append({
-            'id': r[0],  # rowid
-            'name': r[1],  # name  
-            'synonyms': json.loads(r[2]),  # synonyms
-            'age_groups': json.loads(r[3]) if r[3] else []  # age_groups
-        })
-    conn.close()
-    return rows
+    cur.execute(_SQL_SYMPTOM_INDEX)
+    index = {}
+    current = None
+    for r in cur:
+        if r['id'] != current:
+            current = r['id']
+            entry = (r['name'], r['normalized'] or normalize_symptom(r['name']))
+            index.setdefault(r['name'].lower(), entry)
+        if r['synonym'] is not None:
+            index.setdefault(str(r['synonym']).strip().lower(), entry)
+    return index
 
 
 def lookup_symptom(token):
     if not token:
         return None
-    token = token.strip().lower()
-    conn = get_conn()
-    cur = conn.cursor()
-    # exact name match
-    cur.execute('SELECT name, synonyms FROM symptoms')
-    for r in cur.fetchall():
-        name = r['name']
-        if name.lower() == token:
-            conn.close()
-            return name
-        syns = json.loads(r['synonyms'])
-        for s in syns:
-            if str(s).strip().lower() == token:
-                conn.close()
-                return name
-    conn.close()
-    return None
+    entry = _syn_index(_GEN['symptoms']).get(token.strip().lower())
+    return entry[0] if entry else None
 
 
-def add_disease(name, symptoms=None):
+def lookup_symptoms(tokens):
+    """Resolve many symptom tokens against the cached synonym index.
+
+    Returns a dict mapping each lowercased token to the normalized symbol
+    (see normalize_symptom) of its canonical symptom, with the same
+    precedence as lookup_symptom. Unknown tokens are omitted.
+    """
+    index = _syn_index(_GEN['symptoms'])
+    mapping = {}
+    for t in tokens:
+        if not t:
+            continue
+        token = str(t).strip().lower()
+        entry = index.get(token)
+        if entry:
+            mapping[token] = entry[1]
+    return mapping
+
+
+def _disease_params(name, symptoms):
     if not name:
         raise ValueError('name required')
-    symptoms = symptoms or []
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        cur.execute('INSERT INTO diseases (name, symptoms) VALUES (?, ?)', (name, json.dumps(symptoms)))
-        conn.commit()
-        return cur.lastrowid
-    except sqlite3.IntegrityError:
-        cur.execute('SELECT symptoms FROM diseases WHERE name=?', (name,))
-        row = cur.fetchone()
-        if row:
-            existing = json.loads(row['symptoms'])
-            merged = list(dict.fromkeys(existing + symptoms))
-            cur.execute('UPDATE diseases SET symptoms=? WHERE name=?', (json.dumps(merged), name))
-            conn.commit()
-        return None
-    finally:
-        conn.close()
+    return (name, _dumps(symptoms or []))
+
+
+def add_disease(name, symptoms=None):
+    params = _disease_params(name, symptoms)
+    with _writing('diseases') as conn:
+        return conn.execute(_SQL_UPSERT_DISEASE_RETURNING_ID, params).fetchone()[0]
+
+
+def add_diseases_bulk(diseases):
+    """Add or merge many diseases in one transaction.
+
+    `diseases` is an iterable of (name, symptoms) pairs or dicts with those
+    keys. Returns the number of rows written.
+    """
+    params = [
+        _disease_params(*((d.get('name'), d.get('symptoms')) if isinstance(d, dict) else d))
+        for d in diseases
+    ]
+    with _writing('diseases') as conn:
+        conn.executemany(_SQL_UPSERT_DISEASE, params)
+    return len(params)
+
+
+def iter_diseases():
+    for r in get_conn().execute(_SQL_LIST_DISEASES):
+        yield {'id': r['id'], 'name': r['name'], 'symptoms': _loads(r['symptoms'])}
 
 
 def list_diseases():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('SELECT id, name, symptoms FROM diseases ORDER BY name')
-    rows = [{'id': r['id'], 'name': r['name'], 'symptoms': json.loads(r['symptoms'])} for r in cur.fetchall()]
-    conn.close()
-    return rows
+    return list(iter_diseases())
 
 
 def add_rule(rule_id=None, rule_json=None):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('CREATE TABLE IF NOT EXISTS rules (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, rule_json TEXT)')
-    if rule_id is None:
-        # insert
-        cur.execute('INSERT INTO rules (name, rule_json) VALUES (?, ?)', (rule_json.get('name', 'unnamed'), json.dumps(rule_json)))
-        conn.commit()
-        rid = cur.lastrowid
-        conn.close()
-        return rid
-    else:
-        # update by id
-        cur.execute('UPDATE rules SET rule_json=? WHERE id=?', (json.dumps(rule_json), rule_id))
-        conn.commit()
-        conn.close()
-        return rule_id
+    with _writing('rules') as conn:
+        cur = conn.cursor()
+        if rule_id is None:
+            # insert
+            cur.execute(_SQL_INSERT_RULE, (rule_json.get('name', 'unnamed'), _dumps(rule_json)))
+            return cur.lastrowid
+        else:
+            # update by id
+            cur.execute(_SQL_UPDATE_RULE, (_dumps(rule_json), rule_id))
+            return rule_id
 
 
-def list_rules():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('CREATE TABLE IF NOT EXISTS rules (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, rule_json TEXT)')
-    cur.execute('SELECT id, name, rule_json FROM rules ORDER BY id')
-    rows = []
-    for r in cur.fetchall():
+def add_rules_bulk(rules):
+    """Add or update many rules in one transaction.
+
+    `rules` is an iterable of (rule_id, rule_json) pairs with add_rule's
+    meaning: a None id inserts a new rule, any other id updates that rule.
+    Returns the number of rules processed.
+    """
+    inserts, updates = [], []
+    for rule_id, rule_json in rules:
+        if rule_id is None:
+            inserts.append((rule_json.get('name', 'unnamed'), _dumps(rule_json)))
+        else:
+            updates.append((_dumps(rule_json), rule_id))
+    with _writing('rules') as conn:
+        conn.executemany(_SQL_INSERT_RULE, inserts)
+        conn.executemany(_SQL_UPDATE_RULE, updates)
+    return len(inserts) + len(updates)
+
+
+def iter_rules():
+    for r in get_conn().execute(_SQL_LIST_RULES):
         try:
-            rule = json.loads(r['rule_json'])
+            rule = _loads(r['rule_json'])
         except Exception:
             rule = None
-        rows.append({'id': r['id'], 'name': r['name'], 'rule': rule})
-    conn.close()
-    return rows
+        yield {'id': r['id'], 'name': r['name'], 'rule': rule}
+
+
+def list_rules():
+    return list(iter_rules())
 
 
 def get_rule(rule_id):
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute('SELECT id, name, rule_json FROM rules WHERE id=?', (rule_id,))
+    cur.execute(_SQL_GET_RULE, (rule_id,))
     r = cur.fetchone()
-    conn.close()
     if not r:
         return None
     try:
-        rule = json.loads(r['rule_json'])
+        rule = _loads(r['rule_json'])
     except Exception:
         rule = None
     return {'id': r['id'], 'name': r['name'], 'rule': rule}
 
 
 def delete_rule(rule_id):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('DELETE FROM rules WHERE id=?', (rule_id,))
-    conn.commit()
-    conn.close()
+    with _writing('rules') as conn:
+        conn.execute(_SQL_DELETE_RULE, (rule_id,))
     return True
 
 
 def add_hospital(name, latitude, longitude, contact=None, ambulance_available=True, capacity_level='medium'):
     """Add a hospital to the database"""
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            'INSERT INTO hospitals (name, latitude, longitude, contact, ambulance_available, capacity_level) VALUES (?, ?, ?, ?, ?, ?)',
-            (name, latitude, longitude, contact, 1 if ambulance_available else 0, capacity_level)
-        )
-        conn.commit()
-        hid = cur.lastrowid
-        conn.close()
-        return hid
-    except sqlite3.IntegrityError:
-        # Update existing
-        cur.execute(
-            'UPDATE hospitals SET latitude=?, longitude=?, contact=?, ambulance_available=?, capacity_level=? WHERE name=?',
-            (latitude, longitude, contact, 1 if ambulance_available else 0, capacity_level, name)
-        )
-        conn.commit()
-        conn.close()
-        return None
+    with _writing('hospitals') as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                _SQL_INSERT_HOSPITAL,
+                (name, latitude, longitude, contact, 1 if ambulance_available else 0, capacity_level)
+            )
+            return cur.lastrowid
+        except sqlite3.IntegrityError:
+            # Update existing
+            cur.execute(
+                _SQL_UPDATE_HOSPITAL,
+                (latitude, longitude, contact, 1 if ambulance_available else 0, capacity_level, name)
+            )
+            return None
+
+
+def add_hospitals_bulk(hospitals):
+    """Add or update many hospitals in one transaction.
+
+    `hospitals` is an iterable of dicts with add_hospital's keyword
+    arguments. Returns the number of rows written.
+    """
+    params = [(
+        h['name'], h['latitude'], h['longitude'], h.get('contact'),
+        1 if h.get('ambulance_available', True) else 0, h.get('capacity_level', 'medium')
+    ) for h in hospitals]
+    with _writing('hospitals') as conn:
+        conn.executemany(_SQL_UPSERT_HOSPITAL, params)
+    return len(params)
+
+
+def iter_hospitals():
+    for r in get_conn().execute(_SQL_LIST_HOSPITALS):
+        yield _hospital_row(r)
 
 
 def list_hospitals():
     """List all hospitals"""
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('SELECT id, name, latitude, longitude, contact, ambulance_available, capacity_level FROM hospitals ORDER BY name')
-    rows = [{
+    return list(iter_hospitals())
+
+
+def _hospital_row(r):
+    return {
         'id': r['id'], 
         'name': r['name'], 
         'latitude': r['latitude'], 
@@ -242,33 +588,89 @@ def list_hospitals():
         'contact': r['contact'],
         'ambulance_available': bool(r['ambulance_available']),
         'capacity_level': r['capacity_level']
-    } for r in cur.fetchall()]
-    conn.close()
-    return rows
+    }
+
+
+# Radius of the bounding box find_nearest_hospitals tries first. Hospitals
+# outside it are farther than this, so if the box already holds `limit`
+# hospitals within the radius the full scan can be skipped.
+_PREFILTER_KM = 50.0
+
+
+def _hospitals_in_bbox(user_lat, user_lon, radius_km):
+    """Return hospitals inside a lat/lon box around a point, using the
+    latitude/longitude indexes, or None when the box can't be expressed as
+    plain ranges (near the poles or across the antimeridian).
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(user_lat))
+    if abs(user_lat) + dlat >= 90 or cos_lat <= 0:
+        return None
+    dlon = dlat / cos_lat
+    if abs(user_lon) + dlon >= 180:
+        return None
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(_SQL_HOSPITALS_IN_BBOX, (user_lat - dlat, user_lat + dlat, user_lon - dlon, user_lon + dlon))
+    return [_hospital_row(r) for r in cur.fetchall()]
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_listing(table, gen):
+    return {
+        'symptoms': list_symptoms,
+        'diseases': list_diseases,
+        'rules': list_rules,
+        'hospitals': list_hospitals,
+    }[table]()
+
+
+def get_cached(table):
+    """Return the listing of `table`, re-querying only after a write.
+
+    The result is shared between callers and must be treated as read-only.
+    Writes made outside this process (e.g. the seed scripts) are picked up
+    after a restart.
+    """
+    return _cached_listing(table, _GEN[table])
 
 
 def find_nearest_hospitals(user_lat, user_lon, limit=5):
-    """Find nearest hospitals using Haversine distance formula"""
-    import math
-    
-    hospitals = list_hospitals()
+    """Find nearest hospitals using Haversine distance formula.
+
+    Distances are first computed only for the hospitals in an indexed
+    bounding box around the user; the search widens to every hospital when
+    the box doesn't hold `limit` of them within _PREFILTER_KM. Uses the
+    vectorized search when numpy is installed, otherwise the pure-Python
+    scan below.
+    """
+    search = _find_nearest_hospitals_np if np is not None else _find_nearest_hospitals_py
+    candidates = _hospitals_in_bbox(user_lat, user_lon, _PREFILTER_KM)
+    if candidates is not None and limit > 0 and len(candidates) >= limit:
+        nearest = search(user_lat, user_lon, limit, candidates)
+        if nearest[-1]['distance_km'] <= _PREFILTER_KM:
+            return nearest
+    return search(user_lat, user_lon, limit)
+
+
+def _find_nearest_hospitals_py(user_lat, user_lon, limit=5, rows=None):
+    """Pure-Python Haversine scan over `rows` (default: every hospital)."""
+    if rows is None:
+        rows = get_cached('hospitals')
+    hospitals = [dict(h) for h in rows]
     
-    def haversine_distance(lat1, lon1, lat2, lon2):
-        """Calculate distance in kilometers"""
-        R = 6371  # Earth's radius in km
-        
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        a = math.sin(delta_lat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        
-        return R * c
+    # The user's side of the Haversine formula is constant across the loop
+    lat1 = math.radians(user_lat)
+    lon1 = math.radians(user_lon)
+    cos_lat1 = math.cos(lat1)
+    diameter = 2 * EARTH_RADIUS_KM
     
     for h in hospitals:
-        h['distance_km'] = haversine_distance(user_lat, user_lon, h['latitude'], h['longitude'])
+        lat2 = math.radians(h['latitude'])
+        s1 = math.sin((lat2 - lat1) * 0.5)
+        s2 = math.sin((math.radians(h['longitude']) - lon1) * 0.5)
+        a = s1 * s1 + cos_lat1 * math.cos(lat2) * s2 * s2
+        h['distance_km'] = diameter * math.asin(math.sqrt(a))
         # Estimate time: ambulance ~60km/h, matatu/uber ~40km/h in traffic
         h['eta_ambulance_min'] = int((h['distance_km'] / 60) * 60)
         h['eta_matatu_min'] = int((h['distance_km'] / 40) * 60)
@@ -277,3 +679,84 @@ def find_nearest_hospitals(user_lat, user_lon, limit=5):
     hospitals.sort(key=lambda x: x['distance_km'])
     
     return hospitals[:limit]
+
+
+EARTH_RADIUS_KM = 6371
+
+
+def _haversine_vec(lat, lon, lats, lons):
+    """Vectorized Haversine distance in km; all arguments in radians.
+
+    The trig runs in the dtype of `lats`/`lons` (float32 for the hospital
+    arrays); only the final arcsin is promoted to float64.
+    """
+    s1 = np.sin((lats - lat) * 0.5)
+    s2 = np.sin((lons - lon) * 0.5)
+    a = s1 * s1 + np.cos(lat) * np.cos(lats) * s2 * s2
+    a = np.clip(a, 0, 1).astype(np.float64)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _haversine_kernel(lat, lon, lats, lons):
+        out = np.empty(lats.shape[0])
+        cos_lat = np.cos(lat)
+        for i in prange(lats.shape[0]):
+            s1 = np.sin((lats[i] - lat) * 0.5)
+            s2 = np.sin((lons[i] - lon) * 0.5)
+            a = min(max(s1 * s1 + cos_lat * np.cos(lats[i]) * s2 * s2, 0.0), 1.0)
+            out[i] = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.float64(a)))
+        return out
+else:
+    _haversine_kernel = _haversine_vec
+
+
+@functools.lru_cache(maxsize=2)
+def _hospital_arrays(gen):
+    """Return (rows, lat_radians, lon_radians) for all hospitals at a generation."""
+    rows = list_hospitals()
+    lats, lons = _radian_arrays(rows)
+    return rows, lats, lons
+
+
+def _radian_arrays(rows):
+    """Hospital latitudes/longitudes as float32 radian arrays.
+
+    float32 keeps ~1 m of precision at these magnitudes, far below what
+    matters for ranking and ETAs, and halves the bytes the distance pass
+    reads.
+    """
+    lats = np.radians(np.array([h['latitude'] for h in rows], dtype=np.float32))
+    lons = np.radians(np.array([h['longitude'] for h in rows], dtype=np.float32))
+    return lats, lons
+
+
+def _find_nearest_hospitals_np(user_lat, user_lon, limit=5, rows=None):
+    """NumPy version of find_nearest_hospitals.
+
+    Hospital coordinates are kept as radian arrays until the next hospital
+    write, distances are computed in one vectorized (or numba-compiled) pass
+    and only the top `limit` rows are partitioned out and sorted. A `rows`
+    subset (e.g. the bounding-box candidates) is converted on the fly.
+    """
+    if rows is None:
+        rows, lats, lons = _hospital_arrays(_GEN['hospitals'])
+    else:
+        lats, lons = _radian_arrays(rows)
+    k = min(limit, len(rows))
+    if k <= 0:
+        return []
+    dist = _haversine_kernel(np.float32(math.radians(user_lat)), np.float32(math.radians(user_lon)), lats, lons)
+    idx = np.argpartition(dist, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+    idx = idx[np.argsort(dist[idx], kind='stable')]
+
+    nearest = []
+    for i in idx:
+        h = dict(rows[i])
+        h['distance_km'] = float(dist[i])
+        # Estimate time: ambulance ~60km/h, matatu/uber ~40km/h in traffic
+        h['eta_ambulance_min'] = int((h['distance_km'] / 60) * 60)
+        h['eta_matatu_min'] = int((h['distance_km'] / 40) * 60)
+        nearest.append(h)
+    return nearest
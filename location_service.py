@@ -11,23 +11,145 @@ Senior Dev Features:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import logging
-from functools import lru_cache
+import os
+import json
 from typing import Dict, Optional, Tuple, List
 import hashlib
 import math
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import redis
+except ImportError:  # optional: shared cache across worker processes
+    redis = None
+
+try:
+    import xxhash
+except ImportError:  # optional: faster cache-key hashing (blake2b otherwise)
+    xxhash = None
+
+try:
+    import numpy as np
+except ImportError:  # optional: vectorized distances over Overpass results
+    np = None
+
+try:
+    import ijson
+except ImportError:  # optional: stream-parse Overpass responses
+    ijson = None
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional: k-nearest lookups over cached hospital lists
+    cKDTree = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Global cache for geocoding results (production: use Redis)
-GEOCODE_CACHE = {}
+# Coordinate input accepted by _parse_coordinates
+_COORD_RE = re.compile(r'^\s*\(?\s*(?:lat:)?\s*(-?\d+\.?\d*)\s*,\s*(?:lon:)?\s*(-?\d+\.?\d*)\s*\)?\s*$')
+
+# Cache for geocoding and hospital results. With REDIS_URL set (and the redis
+# package installed; it uses the hiredis parser when that is installed too)
+# entries live in Redis so every worker shares them across restarts, and
+# expiry/eviction is left to Redis (configure maxmemory-policy allkeys-lru).
+# This per-process LRU is always consulted first; in front of Redis it keeps
+# hot keys for at most LOCAL_CACHE_TTL so they skip the Redis round trip.
+GEOCODE_CACHE = OrderedDict()  # LRU order: least recently used first
+GEOCODE_CACHE_MAX = 1000
+_CACHE_LOCK = threading.Lock()
+# Spatial indexes over cached hospital lists, keyed like the list itself.
+# Each entry is (expires_at, fingerprint, tree); see _tree_nearest.
+HOSPITAL_TREES = OrderedDict()
+HOSPITAL_TREES_MAX = 128
 CACHE_TTL = 86400  # 24 hours
+HOSPITAL_CACHE_TTL = 6 * 3600  # live OSM hospital lists go stale sooner
+NEGATIVE_CACHE_TTL = 3600  # "no provider knows this address", kept briefly
+LOCAL_CACHE_TTL = 300  # local copies of Redis entries, bounds cross-worker staleness
+REDIS_URL = os.environ.get('REDIS_URL')
+REDIS_KEY_PREFIX = 'geo:v1:'
+# Point this at a self-hosted Nominatim for bulk work; the public server's
+# usage policy forbids it
+NOMINATIM_URL = os.environ.get('NOMINATIM_URL', 'https://nominatim.openstreetmap.org').rstrip('/')
 
 # Rate limiting
-LAST_REQUEST_TIME = {}
 MIN_REQUEST_INTERVAL = 1.0  # 1 second between requests (Nominatim policy)
+# Per-provider (rate in requests/second, burst capacity)
+RATE_LIMITS = {
+    'nominatim': (1.0 / MIN_REQUEST_INTERVAL, 1),
+    'photon': (5.0, 5),
+    'overpass': (1.0, 2),
+}
+# Concurrent geocode() calls the provider pool serves without queueing; each
+# call occupies one worker per provider while it runs
+GEOCODE_CONCURRENCY = 8
+# Workers for reverse_geocode_many. Nominatim's bucket paces them anyway, so
+# two are enough to overlap each call's latency with the next one's wait
+REVERSE_WORKERS = 2
+
+# Atomic refill-and-take for a bucket shared through Redis. Returns the
+# number of seconds the caller must wait before using its token.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+if tokens >= 0 then return '0' end
+return tostring(-tokens / rate)
+"""
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: allows bursts of up to `capacity` requests and
+    refills at `rate` tokens per second. Callers that find the bucket empty
+    reserve the next token and sleep only until it is due, so concurrent
+    callers queue fairly instead of all sleeping a fixed interval.
+
+    With a Redis client the bucket state lives in Redis and is updated by one
+    atomic script, so the limit holds across all worker processes.
+    """
+    
+    def __init__(self, rate: float, capacity: int, redis_client=None, name: str = ''):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._redis = redis_client
+        self._key = f"{REDIS_KEY_PREFIX}ratelimit:{name}"
+        self._script = redis_client.register_script(_TOKEN_BUCKET_LUA) if redis_client is not None else None
+    
+    def acquire(self):
+        """Take one token, sleeping until it is available"""
+        wait = self._reserve()
+        if wait > 0:
+            logger.debug(f"Rate limiting {self._key}: sleeping {wait:.2f}s")
+            time.sleep(wait)
+    
+    def _reserve(self) -> float:
+        if self._script is not None:
+            try:
+                return float(self._script(keys=[self._key], args=[self.rate, self.capacity, time.time()]))
+            except Exception as e:
+                logger.warning(f"Shared rate limiter unavailable, limiting locally: {e}")
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate) - 1
+            self.last_refill = now
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
 
 
 class LocationService:
@@ -40,6 +162,24 @@ class LocationService:
             self._geocode_nominatim,
             self._geocode_photon,
         ]
+        self._redis = self._connect_redis()
+        self._buckets = {
+            name: TokenBucket(rate, capacity, self._redis, name)
+            for name, (rate, capacity) in RATE_LIMITS.items()
+        }
+        # Runs the geocoding providers side by side (see geocode)
+        self._pool = ThreadPoolExecutor(
+            max_workers=GEOCODE_CONCURRENCY * len(self.providers), thread_name_prefix='geocode'
+        )
+        # Reverse batches get their own workers: a 100-point batch held to
+        # 1 request/s would otherwise sit in front of geocode's provider calls
+        self._reverse_pool = ThreadPoolExecutor(
+            max_workers=REVERSE_WORKERS, thread_name_prefix='reverse-geocode'
+        )
+        self._session = self._create_session()
+        # Overpass queries are heavy and rate limited, and a retry would go
+        # out without taking another token, so their POSTs are never retried
+        self._overpass_session = self._create_session(retry=False)
     
     def geocode(self, address: str) -> Optional[Dict]:
         """
@@ -51,25 +191,40 @@ class LocationService:
         Returns:
             Dict with lat, lon, formatted_address or None if failed
         """
-        # Check cache first
-        cache_key = self._get_cache_key(address)
+        # Check cache first; case and surrounding spaces don't change the result
+        cache_key = self._get_cache_key(address.strip().lower())
         cached = self._get_from_cache(cache_key)
         if cached:
             logger.info(f"Cache hit for address: {address}")
             return cached
+        negative_key = f"neg:{cache_key}"
+        if self._get_from_cache(negative_key):
+            logger.debug(f"Negative cache hit for address: {address}")
+            return None
         
-        # Try each provider with fallback
-        for provider_func in self.providers:
+        # Query every provider concurrently so a failing primary doesn't add
+        # its full round trip before the fallback starts; results are still
+        # taken in provider order, so Nominatim wins whenever it answers
+        futures = [(f, self._pool.submit(f, address)) for f in self.providers]
+        errored = False
+        for i, (provider_func, future) in enumerate(futures):
             try:
-                result = provider_func(address)
+                result = future.result()
                 if result:
+                    for _, pending in futures[i + 1:]:
+                        pending.cancel()
                     # Cache successful result
                     self._save_to_cache(cache_key, result)
                     return result
             except Exception as e:
                 logger.warning(f"{provider_func.__name__} failed: {e}")
+                errored = True
                 continue
         
+        # Remember addresses every provider answered "not found" for, so a
+        # repeated typo doesn't go upstream again; errors aren't cached
+        if not errored:
+            self._save_to_cache(negative_key, True, NEGATIVE_CACHE_TTL)
         logger.error(f"All geocoding providers failed for: {address}")
         return None
     
@@ -84,14 +239,15 @@ class LocationService:
         Returns:
             Formatted address string or None
         """
-        cache_key = self._get_cache_key(f"{lat},{lon}")
+        # Key on ~10 m precision so nearby lookups share one cached address
+        cache_key = self._get_cache_key(f"{round(lat, 4)},{round(lon, 4)}")
         cached = self._get_from_cache(cache_key)
         if cached:
             return cached
         
         try:
             self._rate_limit('nominatim')
-            url = 'https://nominatim.openstreetmap.org/reverse'
+            url = f'{NOMINATIM_URL}/reverse'
             params = {
                 'format': 'json',
                 'lat': lat,
@@ -99,9 +255,7 @@ class LocationService:
                 'zoom': 18,
                 'addressdetails': 1
             }
-            headers = {'User-Agent': 'MedicalTriageApp/1.0'}
-            
-            response = requests.get(url, params=params, headers=headers, timeout=5)
+            response = self._session.get(url, params=params, timeout=5)
             response.raise_for_status()
             data = response.json()
             
@@ -114,6 +268,31 @@ class LocationService:
         
         return None
     
+    def reverse_geocode_many(self, points: List[Tuple[float, float]]) -> List[Optional[str]]:
+        """
+        Reverse geocode many coordinates, in input order
+        
+        Lookups run on a pool separate from geocode's, so their network
+        latency overlaps without delaying forward geocodes, while the
+        Nominatim token bucket still paces the upstream calls.
+        Cache hits return before touching the bucket, and points sharing a
+        cache key are only looked up once.
+        
+        Args:
+            points: (lat, lon) pairs
+            
+        Returns:
+            Address string or None for each point
+        """
+        unique = {}
+        for lat, lon in points:
+            unique.setdefault((round(lat, 4), round(lon, 4)), (lat, lon))
+        futures = {
+            key: self._reverse_pool.submit(self.reverse_geocode, lat, lon)
+            for key, (lat, lon) in unique.items()
+        }
+        return [futures[(round(lat, 4), round(lon, 4))].result() for lat, lon in points]
+    
     def validate_coordinates(self, lat: float, lon: float) -> bool:
         """
         Validate if coordinates are within valid ranges
@@ -168,16 +347,14 @@ class LocationService:
         """Geocode using OpenStreetMap Nominatim (free, no API key)"""
         self._rate_limit('nominatim')
         
-        url = 'https://nominatim.openstreetmap.org/search'
+        url = f'{NOMINATIM_URL}/search'
         params = {
             'q': address,
             'format': 'json',
             'limit': 1,
             'addressdetails': 1
         }
-        headers = {'User-Agent': 'MedicalTriageApp/1.0'}
-        
-        response = requests.get(url, params=params, headers=headers, timeout=5)
+        response = self._session.get(url, params=params, timeout=5)
         response.raise_for_status()
         results = response.json()
         
@@ -200,7 +377,7 @@ class LocationService:
             'limit': 1
         }
         
-        response = requests.get(url, params=params, timeout=5)
+        response = self._session.get(url, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         
@@ -226,63 +403,98 @@ class LocationService:
             "lat:-1.2921,lon:36.8219"
             "(-1.2921, 36.8219)"
         """
-        import re
-        
-        # Remove common prefixes and whitespace
-        text = text.strip().replace('lat:', '').replace('lon:', '').replace('(', '').replace(')', '')
-        
-        # Try to match two numbers separated by comma
-        match = re.match(r'^(-?\d+\.?\d*)\s*,\s*(-?\d+\.?\d*)$', text)
+        # Two numbers separated by a comma, with optional parentheses and
+        # lat:/lon: prefixes
+        match = _COORD_RE.match(text)
         if match:
-            try:
-                lat = float(match.group(1))
-                lon = float(match.group(2))
-                return (lat, lon)
-            except ValueError:
-                pass
-        
+            return (float(match[1]), float(match[2]))
         return None
     
     def _rate_limit(self, provider: str):
         """Implement rate limiting to respect API policies"""
-        global LAST_REQUEST_TIME
-        
-        now = time.time()
-        last_time = LAST_REQUEST_TIME.get(provider, 0)
-        elapsed = now - last_time
-        
-        if elapsed < MIN_REQUEST_INTERVAL:
-            sleep_time = MIN_REQUEST_INTERVAL - elapsed
-            logger.debug(f"Rate limiting {provider}: sleeping {sleep_time:.2f}s")
-            time.sleep(sleep_time)
-        
-        LAST_REQUEST_TIME[provider] = time.time()
+        self._buckets[provider].acquire()
     
     def _get_cache_key(self, text: str) -> str:
-        """Generate cache key from text"""
-        return hashlib.md5(text.lower().encode()).hexdigest()
+        """Generate cache key from text (not security sensitive)"""
+        data = text.lower().encode()
+        if xxhash is not None:
+            return xxhash.xxh3_64_hexdigest(data)
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+    
+    def _create_session(self, retry: bool = True) -> requests.Session:
+        """HTTP session with keep-alive connections, gzip and, unless `retry`
+        is False, retries with backoff (connect errors included)"""
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': 'MedicalTriageApp/1.0',
+            'Accept-Encoding': 'gzip',
+        })
+        max_retries = 0
+        if retry:
+            max_retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=max_retries)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)  # e.g. a self-hosted NOMINATIM_URL
+        return session
+    
+    def _connect_redis(self):
+        """Return a Redis client for REDIS_URL, or None to use the local dict"""
+        if redis is None or not REDIS_URL:
+            return None
+        try:
+            client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning(f"Redis cache unavailable, using in-process cache: {e}")
+            return None
     
     def _get_from_cache(self, key: str) -> Optional[any]:
         """Get from cache if not expired"""
-        if key in GEOCODE_CACHE:
-            cached_time, value = GEOCODE_CACHE[key]
-            if time.time() - cached_time < CACHE_TTL:
+        value = self._get_local(key)
+        if value is not None or self._redis is None:
+            return value
+        try:
+            raw = self._redis.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            logger.warning(f"Redis get failed: {e}")
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self._save_local(key, value, LOCAL_CACHE_TTL)
+        return value
+    
+    def _get_local(self, key: str) -> Optional[any]:
+        with _CACHE_LOCK:
+            entry = GEOCODE_CACHE.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.time() < expires_at:
+                GEOCODE_CACHE.move_to_end(key)
                 return value
-            else:
-                # Expired, remove from cache
-                del GEOCODE_CACHE[key]
+            # Expired, remove from cache
+            del GEOCODE_CACHE[key]
         return None
     
-    def _save_to_cache(self, key: str, value: any):
-        """Save to cache with timestamp"""
-        GEOCODE_CACHE[key] = (time.time(), value)
-        
-        # Simple cache size management (keep last 1000 entries)
-        if len(GEOCODE_CACHE) > 1000:
-            # Remove oldest 100 entries
-            sorted_keys = sorted(GEOCODE_CACHE.items(), key=lambda x: x[1][0])
-            for old_key, _ in sorted_keys[:100]:
-                del GEOCODE_CACHE[old_key]
+    def _save_to_cache(self, key: str, value: any, ttl: int = CACHE_TTL):
+        """Save to cache with an expiry `ttl` seconds from now"""
+        if self._redis is not None:
+            try:
+                self._redis.setex(REDIS_KEY_PREFIX + key, ttl, json.dumps(value))
+                ttl = min(ttl, LOCAL_CACHE_TTL)
+            except Exception as e:
+                logger.warning(f"Redis set failed: {e}")
+        self._save_local(key, value, ttl)
+    
+    def _save_local(self, key: str, value: any, ttl: int):
+        with _CACHE_LOCK:
+            GEOCODE_CACHE[key] = (time.time() + ttl, value)
+            GEOCODE_CACHE.move_to_end(key)
+            # Keep the most recently used entries, evicting the oldest
+            while len(GEOCODE_CACHE) > GEOCODE_CACHE_MAX:
+                GEOCODE_CACHE.popitem(last=False)
     
     def find_nearby_hospitals(self, lat: float, lon: float, radius_km: float = 10, limit: int = 10) -> List[Dict]:
         """
@@ -302,12 +514,14 @@ class LocationService:
         Returns:
             List of hospitals with name, distance, coordinates, etc.
         """
-        # Check cache first
-        cache_key = self._get_cache_key(f"hospitals_{lat}_{lon}_{radius_km}")
+        # Check cache first. The key is rounded to ~100 m so requests a few
+        # metres apart share one Overpass result; distances are recomputed
+        # from the precise coordinates on a hit.
+        cache_key = self._get_cache_key(f"hosp2:{round(lat, 3)}:{round(lon, 3)}:{radius_km}")
         cached = self._get_from_cache(cache_key)
-        if cached:
+        if cached and cached['hospitals']:
             logger.info(f"Cache hit for hospitals near {lat}, {lon}")
-            return cached[:limit]
+            return self._nearest_in_fleet(cache_key, cached, lat, lon, limit)
         
         try:
             self._rate_limit('overpass')
@@ -316,74 +530,172 @@ class LocationService:
             radius_m = int(radius_km * 1000)
             
             # Overpass API query - searches for hospitals, clinics, and pharmacies
+            # in a single statement (one around: scan instead of six)
             overpass_query = f"""
             [out:json][timeout:25];
-            (
-              node["amenity"="hospital"](around:{radius_m},{lat},{lon});
-              way["amenity"="hospital"](around:{radius_m},{lat},{lon});
-              node["amenity"="clinic"](around:{radius_m},{lat},{lon});
-              way["amenity"="clinic"](around:{radius_m},{lat},{lon});
-              node["amenity"="pharmacy"](around:{radius_m},{lat},{lon});
-              way["amenity"="pharmacy"](around:{radius_m},{lat},{lon});
-            );
+            nwr["amenity"~"^(hospital|clinic|pharmacy)$"](around:{radius_m},{lat},{lon});
             out center;
             """
             
             url = 'https://overpass-api.de/api/interpreter'
-            response = requests.post(url, data={'data': overpass_query}, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
             hospitals = []
+            lats = []
+            lons = []
             
-            for element in data.get('elements', []):
-                # Get coordinates
-                if 'lat' in element and 'lon' in element:
-                    hospital_lat = element['lat']
-                    hospital_lon = element['lon']
-                elif 'center' in element:
-                    hospital_lat = element['center']['lat']
-                    hospital_lon = element['center']['lon']
-                else:
-                    continue
-                
-                # Get tags
-                tags = element.get('tags', {})
-                name = tags.get('name', tags.get('amenity', 'Unnamed').capitalize())
-                
-                # Calculate distance
-                distance_km = self._haversine_distance(lat, lon, hospital_lat, hospital_lon)
-                
-                hospital_info = {
-                    'id': element.get('id'),
-                    'name': name,
-                    'latitude': hospital_lat,
-                    'longitude': hospital_lon,
-                    'distance_km': distance_km,
-                    'distance_text': f"{distance_km:.1f} km",
-                    'type': tags.get('amenity', 'hospital'),
-                    'address': tags.get('addr:full') or tags.get('addr:street', ''),
-                    'phone': tags.get('phone', tags.get('contact:phone', '')),
-                    'website': tags.get('website', tags.get('contact:website', '')),
-                    'emergency': tags.get('emergency', 'no'),
-                    'source': 'OpenStreetMap'
-                }
-                
-                hospitals.append(hospital_info)
+            with self._overpass_session.post(url, data={'data': overpass_query}, timeout=30,
+                                             stream=ijson is not None) as response:
+                response.raise_for_status()
+                for element in self._overpass_elements(response):
+                    # Get coordinates
+                    if 'lat' in element and 'lon' in element:
+                        hospital_lat = element['lat']
+                        hospital_lon = element['lon']
+                    elif 'center' in element:
+                        hospital_lat = element['center']['lat']
+                        hospital_lon = element['center']['lon']
+                    else:
+                        continue
+                    
+                    # Get tags
+                    tags = element.get('tags', {})
+                    name = tags.get('name', tags.get('amenity', 'Unnamed').capitalize())
+                    
+                    hospital_info = {
+                        'id': element.get('id'),
+                        'name': name,
+                        'latitude': hospital_lat,
+                        'longitude': hospital_lon,
+                        'distance_km': None,  # filled in below
+                        'distance_text': '',
+                        'type': tags.get('amenity', 'hospital'),
+                        'address': tags.get('addr:full') or tags.get('addr:street', ''),
+                        'phone': tags.get('phone', tags.get('contact:phone', '')),
+                        'website': tags.get('website', tags.get('contact:website', '')),
+                        'emergency': tags.get('emergency', 'no'),
+                        'source': 'OpenStreetMap'
+                    }
+                    
+                    hospitals.append(hospital_info)
+                    lats.append(hospital_lat)
+                    lons.append(hospital_lon)
             
-            # Sort by distance
-            hospitals.sort(key=lambda x: x['distance_km'])
+            # Calculate distances and sort nearest first
+            hospitals = self._sorted_by_distance(hospitals, lats, lons, lat, lon)
             
-            # Cache the results
-            self._save_to_cache(cache_key, hospitals)
+            # Cache the results column-wise (see _nearest_in_fleet)
+            fleet = {
+                'lat': [h['latitude'] for h in hospitals],
+                'lon': [h['longitude'] for h in hospitals],
+                'hospitals': hospitals,
+            }
+            self._save_to_cache(cache_key, fleet, HOSPITAL_CACHE_TTL)
             
             logger.info(f"Found {len(hospitals)} hospitals near {lat}, {lon}")
-            return hospitals[:limit]
+            # Copies, like _nearest_in_fleet's: callers may annotate the
+            # results, and these dicts are the cached fleet's own
+            return [dict(h) for h in hospitals[:limit]]
         
         except Exception as e:
             logger.error(f"Error fetching hospitals from Overpass API: {e}")
             return []
     
+    def _overpass_elements(self, response):
+        """Iterate the elements of an Overpass JSON response
+        
+        With ijson installed the (streamed) body is parsed one element at a
+        time, so the full payload is never held in memory; otherwise it is
+        decoded in one go.
+        """
+        if ijson is None:
+            return iter(response.json().get('elements', []))
+        response.raw.decode_content = True  # undo gzip transfer encoding
+        return ijson.items(response.raw, 'elements.item', use_float=True)
+    
+    def _nearest_in_fleet(self, cache_key: str, fleet: Dict, lat: float, lon: float,
+                          limit: int) -> List[Dict]:
+        """The `limit` hospitals of a cached fleet nearest (lat, lon)
+        
+        A fleet is stored column-wise, {'lat': [...], 'lon': [...],
+        'hospitals': [...]}, so the re-ranking for new user coordinates
+        works on the coordinate columns alone (a k-d tree when scipy is
+        installed, one vectorized Haversine pass otherwise) and only the
+        returned hospitals are copied.
+        """
+        hospitals = fleet['hospitals']
+        if not hospitals or limit <= 0:
+            return []
+        if cKDTree is not None and np is not None:
+            idx = self._tree_nearest(cache_key, fleet, lat, lon, min(limit, len(hospitals)))
+        else:
+            distances = self._distances_km(lat, lon, fleet['lat'], fleet['lon'])
+            idx = self._distance_order(distances)[:limit]
+        nearest = [dict(hospitals[i]) for i in idx]
+        return self._sorted_by_distance(nearest, [fleet['lat'][i] for i in idx],
+                                        [fleet['lon'][i] for i in idx], lat, lon)
+    
+    def _tree_nearest(self, cache_key: str, fleet: Dict, lat: float, lon: float, k: int) -> List[int]:
+        """Indexes of the k fleet entries nearest (lat, lon), via a k-d tree
+        
+        The tree holds unit vectors on the sphere, so chord length orders
+        points exactly as great-circle distance does. It is built once per
+        cached fleet and reused until that fleet expires.
+        """
+        hospitals = fleet['hospitals']
+        fingerprint = (len(hospitals), hospitals[0].get('id'), hospitals[-1].get('id'))
+        with _CACHE_LOCK:
+            entry = HOSPITAL_TREES.get(cache_key)
+            if entry is not None and entry[0] > time.time() and entry[1] == fingerprint:
+                HOSPITAL_TREES.move_to_end(cache_key)
+                tree = entry[2]
+            else:
+                tree = None
+        if tree is None:
+            tree = cKDTree(self._unit_vectors(fleet['lat'], fleet['lon']))
+            with _CACHE_LOCK:
+                HOSPITAL_TREES[cache_key] = (time.time() + HOSPITAL_CACHE_TTL, fingerprint, tree)
+                while len(HOSPITAL_TREES) > HOSPITAL_TREES_MAX:
+                    HOSPITAL_TREES.popitem(last=False)
+        _, idx = tree.query(self._unit_vectors([lat], [lon])[0], k=k)
+        return np.atleast_1d(idx).tolist()
+    
+    def _unit_vectors(self, lats: List[float], lons: List[float]):
+        """Latitude/longitude columns in degrees -> (n, 3) points on the unit sphere"""
+        la = np.radians(np.asarray(lats, dtype=np.float64))
+        lo = np.radians(np.asarray(lons, dtype=np.float64))
+        cos_lat = np.cos(la)
+        return np.column_stack((cos_lat * np.cos(lo), cos_lat * np.sin(lo), np.sin(la)))
+    
+    def _sorted_by_distance(self, hospitals: List[Dict], lats: List[float], lons: List[float],
+                            lat: float, lon: float) -> List[Dict]:
+        """Set distance fields on `hospitals` (parallel to lats/lons) and sort nearest first"""
+        distances = self._distances_km(lat, lon, lats, lons)
+        for h, d in zip(hospitals, distances):
+            h['distance_km'] = d
+            h['distance_text'] = f"{d:.1f} km"
+        return [hospitals[i] for i in self._distance_order(distances)]
+    
+    def _distance_order(self, distances: List[float]) -> List[int]:
+        """Indexes sorting `distances` ascending; ties keep their input order"""
+        if np is None:
+            return sorted(range(len(distances)), key=distances.__getitem__)
+        return np.argsort(distances, kind='stable').tolist()
+    
+    def _distances_km(self, lat: float, lon: float, lats: List[float], lons: List[float]) -> List[float]:
+        """Haversine distances from (lat, lon) to each point of the lats/lons columns
+
+        Computed in one vectorized pass when numpy is installed, otherwise
+        with _haversine_distance per point.
+        """
+        if np is None or not lats:
+            return [self._haversine_distance(lat, lon, la, lo) for la, lo in zip(lats, lons)]
+        la = np.radians(np.asarray(lats, dtype=np.float64))
+        lo = np.radians(np.asarray(lons, dtype=np.float64))
+        lat1 = math.radians(lat)
+        s1 = np.sin((la - lat1) * 0.5)
+        s2 = np.sin((lo - math.radians(lon)) * 0.5)
+        a = s1 * s1 + math.cos(lat1) * np.cos(la) * s2 * s2
+        return (2 * 6371 * np.arcsin(np.sqrt(a))).tolist()
+    
     def _haversine_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """
         Calculate distance between two coordinates using Haversine formula
@@ -419,6 +731,11 @@ def reverse_geocode(lat: float, lon: float) -> Optional[str]:
     return location_service.reverse_geocode(lat, lon)
 
 
+def reverse_geocode_many(points: List[Tuple[float, float]]) -> List[Optional[str]]:
+    """Convert many coordinates to addresses"""
+    return location_service.reverse_geocode_many(points)
+
+
 def parse_location(location_input: str) -> Optional[Dict]:
     """Parse flexible location input (address or coordinates)"""
     return location_service.parse_location_input(location_input)
@@ -89,11 +89,11 @@ hospitals = [
 ]
 
 print("Adding hospitals to database...")
-for h in hospitals:
-    try:
-        db.add_hospital(**h)
+try:
+    db.add_hospitals_bulk(hospitals)
+    for h in hospitals:
         print(f"✓ Added: {h['name']}")
-    except Exception as e:
-        print(f"✗ Failed to add {h['name']}: {e}")
+except Exception as e:
+    print(f"✗ Failed to add hospitals: {e}")
 
 print(f"\nTotal hospitals in database: {len(db.list_hospitals())}")
@@ -1,6 +1,5 @@
 """Seed symptoms, diseases, and comprehensive rules"""
 import db
-import json
 
 # Initialize DB
 db.init_db()
@@ -28,12 +27,12 @@ symptoms = [
 ]
 
 print("Adding symptoms...")
-for s in symptoms:
-    try:
-        db.add_symptom(s["name"], s["synonyms"])
+try:
+    db.add_symptoms_bulk(symptoms)
+    for s in symptoms:
         print(f"✓ Added: {s['name']}")
-    except Exception as e:
-        print(f"✗ Failed to add {s['name']}: {e}")
+except Exception as e:
+    print(f"✗ Failed to add symptoms: {e}")
 
 # Diseases with symptom associations
 diseases = [
@@ -60,14 +59,17 @@ diseases = [
 ]
 
 print("\nAdding diseases...")
-for d in diseases:
-    try:
-        db.add_disease(d["name"], d["symptoms"])
+try:
+    db.add_diseases_bulk(diseases)
+    for d in diseases:
         print(f"✓ Added: {d['name']}")
-    except Exception as e:
-        print(f"✗ Failed to add {d['name']}: {e}")
+except Exception as e:
+    print(f"✗ Failed to add diseases: {e}")
 
-# Comprehensive multi-symptom rules
+# Comprehensive multi-symptom rules, in the schema translate_rules_to_clp
+# and compile_rules read: {"field", "operator", "value"} conditions and
+# set_triage_level / set_transport / set_rationale actions. Transports must
+# be one the triage-result template allows (ambulance, matatu, chemist, none).
 rules = [
     {
         "id": "R1",
@@ -75,13 +77,13 @@ rules = [
         "description": "Chest pain in elderly - likely heart attack",
         "salience": 100,
         "conditions": [
-            {"type": "age", "operator": ">", "value": 50},
-            {"type": "symptom", "name": "chest-pain"}
+            {"field": "age", "operator": ">", "value": 50},
+            {"field": "symptom", "operator": "contains", "value": "chest-pain"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "RED"},
-            {"type": "set_transport", "value": "ambulance"},
-            {"type": "set_rationale", "value": "Possible heart attack - immediate emergency transport required"}
+            {"set_triage_level": "RED"},
+            {"set_transport": "ambulance"},
+            {"set_rationale": "Possible heart attack - immediate emergency transport required"}
         ]
     },
     {
@@ -90,14 +92,14 @@ rules = [
         "description": "Fever with stiff neck and headache - meningitis concern",
         "salience": 95,
         "conditions": [
-            {"type": "symptom", "name": "fever"},
-            {"type": "symptom", "name": "stiff-neck"},
-            {"type": "symptom", "name": "headache"}
+            {"field": "symptom", "operator": "contains", "value": "fever"},
+            {"field": "symptom", "operator": "contains", "value": "stiff-neck"},
+            {"field": "symptom", "operator": "contains", "value": "headache"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "RED"},
-            {"type": "set_transport", "value": "ambulance"},
-            {"type": "set_rationale", "value": "Suspected meningitis - urgent hospital evaluation required"}
+            {"set_triage_level": "RED"},
+            {"set_transport": "ambulance"},
+            {"set_rationale": "Suspected meningitis - urgent hospital evaluation required"}
         ]
     },
     {
@@ -106,12 +108,12 @@ rules = [
         "description": "Difficulty breathing requiring immediate care",
         "salience": 90,
         "conditions": [
-            {"type": "symptom", "name": "difficulty-breathing"}
+            {"field": "symptom", "operator": "contains", "value": "difficulty-breathing"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "RED"},
-            {"type": "set_transport", "value": "ambulance"},
-            {"type": "set_rationale", "value": "Severe respiratory distress - oxygen support needed immediately"}
+            {"set_triage_level": "RED"},
+            {"set_transport": "ambulance"},
+            {"set_rationale": "Severe respiratory distress - oxygen support needed immediately"}
         ]
     },
     {
@@ -120,12 +122,12 @@ rules = [
         "description": "Severe bleeding or unconsciousness",
         "salience": 100,
         "conditions": [
-            {"type": "symptom", "name": "severe-bleeding"}
+            {"field": "symptom", "operator": "contains", "value": "severe-bleeding"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "RED"},
-            {"type": "set_transport", "value": "ambulance"},
-            {"type": "set_rationale", "value": "Severe trauma with bleeding - immediate ambulance required"}
+            {"set_triage_level": "RED"},
+            {"set_transport": "ambulance"},
+            {"set_rationale": "Severe trauma with bleeding - immediate ambulance required"}
         ]
     },
     {
@@ -134,12 +136,12 @@ rules = [
         "description": "Patient unconscious or unresponsive",
         "salience": 100,
         "conditions": [
-            {"type": "symptom", "name": "unconscious"}
+            {"field": "symptom", "operator": "contains", "value": "unconscious"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "RED"},
-            {"type": "set_transport", "value": "ambulance"},
-            {"type": "set_rationale", "value": "Unconscious patient - immediate emergency care required"}
+            {"set_triage_level": "RED"},
+            {"set_transport": "ambulance"},
+            {"set_rationale": "Unconscious patient - immediate emergency care required"}
         ]
     },
     {
@@ -148,13 +150,13 @@ rules = [
         "description": "Severe abdominal pain with vomiting",
         "salience": 70,
         "conditions": [
-            {"type": "symptom", "name": "abdominal-pain"},
-            {"type": "symptom", "name": "vomiting"}
+            {"field": "symptom", "operator": "contains", "value": "abdominal-pain"},
+            {"field": "symptom", "operator": "contains", "value": "vomiting"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "YELLOW"},
-            {"type": "set_transport", "value": "matatu"},
-            {"type": "set_rationale", "value": "Acute abdominal condition - hospital evaluation needed within hours"}
+            {"set_triage_level": "YELLOW"},
+            {"set_transport": "matatu"},
+            {"set_rationale": "Acute abdominal condition - hospital evaluation needed within hours"}
         ]
     },
     {
@@ -163,14 +165,14 @@ rules = [
         "description": "Fever with cough and headache - flu symptoms",
         "salience": 60,
         "conditions": [
-            {"type": "symptom", "name": "fever"},
-            {"type": "symptom", "name": "cough"},
-            {"type": "symptom", "name": "headache"}
+            {"field": "symptom", "operator": "contains", "value": "fever"},
+            {"field": "symptom", "operator": "contains", "value": "cough"},
+            {"field": "symptom", "operator": "contains", "value": "headache"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "YELLOW"},
-            {"type": "set_transport", "value": "matatu"},
-            {"type": "set_rationale", "value": "Flu-like symptoms - medical consultation recommended today"}
+            {"set_triage_level": "YELLOW"},
+            {"set_transport": "matatu"},
+            {"set_rationale": "Flu-like symptoms - medical consultation recommended today"}
         ]
     },
     {
@@ -179,13 +181,13 @@ rules = [
         "description": "Diabetic patient with fever needs monitoring",
         "salience": 65,
         "conditions": [
-            {"type": "history", "name": "diabetes"},
-            {"type": "symptom", "name": "fever"}
+            {"field": "history", "operator": "=", "value": "diabetes"},
+            {"field": "symptom", "operator": "contains", "value": "fever"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "YELLOW"},
-            {"type": "set_transport", "value": "matatu"},
-            {"type": "set_rationale", "value": "Diabetic with infection risk - hospital visit recommended"}
+            {"set_triage_level": "YELLOW"},
+            {"set_transport": "matatu"},
+            {"set_rationale": "Diabetic with infection risk - hospital visit recommended"}
         ]
     },
     {
@@ -194,12 +196,12 @@ rules = [
         "description": "Simple headache without other symptoms",
         "salience": 20,
         "conditions": [
-            {"type": "symptom", "name": "headache"}
+            {"field": "symptom", "operator": "contains", "value": "headache"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "GREEN"},
-            {"type": "set_transport", "value": "self-care"},
-            {"type": "set_rationale", "value": "Mild headache - over-the-counter medication recommended, visit chemist if persists"}
+            {"set_triage_level": "GREEN"},
+            {"set_transport": "chemist"},
+            {"set_rationale": "Mild headache - over-the-counter medication recommended, visit chemist if persists"}
         ]
     },
     {
@@ -208,31 +210,31 @@ rules = [
         "description": "Fever alone without complications",
         "salience": 25,
         "conditions": [
-            {"type": "symptom", "name": "fever"}
+            {"field": "symptom", "operator": "contains", "value": "fever"}
         ],
         "actions": [
-            {"type": "set_triage_level", "value": "GREEN"},
-            {"type": "set_transport", "value": "self-care"},
-            {"type": "set_rationale", "value": "Mild fever - rest and fluids recommended, visit chemist for medication"}
+            {"set_triage_level": "GREEN"},
+            {"set_transport": "chemist"},
+            {"set_rationale": "Mild fever - rest and fluids recommended, visit chemist for medication"}
         ]
     }
 ]
 
 print("\nAdding comprehensive rules...")
-for r in rules:
-    try:
-        rule_json = {
-            "id": r["id"],
-            "name": r["name"],
-            "description": r["description"],
-            "salience": r["salience"],
-            "conditions": r["conditions"],
-            "actions": r["actions"]
-        }
-        db.add_rule(r["id"], json.dumps(rule_json))
-        print(f"✓ Added: {r['id']} - {r['name']}")
-    except Exception as e:
-        print(f"✗ Failed to add {r['id']}: {e}")
+# add_rules_bulk inserts rows with a None id and updates the others by their
+# DB id, so rules already seeded under the same name are updated in place
+# (names are UNIQUE) and re-running the script doesn't fail. The "R1".. ids
+# inside each rule are labels, not DB ids. Each rule dict already has
+# exactly the stored fields.
+existing_ids = {r['name']: r['id'] for r in db.list_rules()}
+rule_rows = [(existing_ids.get(r["name"]), r) for r in rules]
+try:
+    db.add_rules_bulk(rule_rows)
+    for (rule_id, _), r in zip(rule_rows, rules):
+        verb = "Updated" if rule_id is not None else "Added"
+        print(f"✓ {verb}: {r['id']} - {r['name']}")
+except Exception as e:
+    print(f"✗ Failed to add rules: {e}")
 
 print(f"\nTotal symptoms: {len(db.list_symptoms())}")
 print(f"Total diseases: {len(db.list_diseases())}")
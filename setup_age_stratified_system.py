@@ -12,182 +12,240 @@ Creates:
 
 import sqlite3
 import json
+import functools
+import contextlib
 
-def create_age_groups_table():
-    """Create age_groups table with 10 clinically relevant age ranges"""
+
+@contextlib.contextmanager
+def _connect():
+    """Open data.db tuned for bulk writes, for use as a `with` block.
+
+    WAL with synchronous=NORMAL syncs only at checkpoints instead of on
+    every commit; temp tables and a 64 MB page cache stay in memory. The
+    block's writes are committed when it exits normally and rolled back if
+    it raises; the connection is closed either way.
+    """
     conn = sqlite3.connect('data.db')
-    cursor = conn.cursor()
-    
-    # Create age_groups table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS age_groups (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            min_age INTEGER NOT NULL,
-            max_age INTEGER NOT NULL,
-            name TEXT NOT NULL,
-            description TEXT,
-            UNIQUE(min_age, max_age)
+    try:
+        conn.executescript(
+            "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; "
+            "PRAGMA temp_store=MEMORY; PRAGMA cache_size=-65536;"
         )
-    """)
-    
-    age_groups = [
-        (0, 10, 'Infant/Child', 'Newborns, infants, toddlers, and young children'),
-        (11, 20, 'Adolescent', 'Teenagers and young adults'),
-        (21, 30, 'Young Adult', 'Early adulthood'),
-        (31, 40, 'Adult', 'Middle adulthood'),
-        (41, 50, 'Middle Age', 'Prime middle age'),
-        (51, 60, 'Mature Adult', 'Late middle age'),
-        (61, 70, 'Senior', 'Early elderly'),
-        (71, 80, 'Elderly', 'Advanced elderly'),
-        (81, 90, 'Geriatric', 'Very elderly'),
-        (91, 120, 'Advanced Geriatric', 'Oldest elderly'),
-    ]
-    
-    for min_age, max_age, name, desc in age_groups:
-        cursor.execute("""
-            INSERT OR IGNORE INTO age_groups (min_age, max_age, name, description)
-            VALUES (?, ?, ?, ?)
-        """, (min_age, max_age, name, desc))
-    
-    conn.commit()
-    
-    # Verify
-    cursor.execute("SELECT * FROM age_groups ORDER BY min_age")
-    groups = cursor.fetchall()
-    print("\n✅ Created Age Groups:")
-    print("-" * 70)
-    for g in groups:
-        print(f"   {g[0]}. Ages {g[1]:3d}-{g[2]:3d}: {g[3]:20s} - {g[4]}")
-    
-    conn.close()
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _dumps(obj):
+    """Compact JSON ("[1,2,3]") for the synonyms and age_groups columns"""
+    return json.dumps(obj, separators=(',', ':'))
+
+
+@functools.lru_cache(maxsize=None)
+def _age_groups_json(ids):
+    """JSON for a tuple of age group ids; most symptoms share a few lists"""
+    return _dumps(list(ids))
+
+
+_AGE_GROUPS_COLUMNS = """
+    id INTEGER PRIMARY KEY,
+    min_age INTEGER NOT NULL,
+    max_age INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    UNIQUE(min_age, max_age)
+"""
+
+
+def create_age_groups_table():
+    """Create age_groups table with 10 clinically relevant age ranges"""
+    with _connect() as conn:
+        cursor = conn.cursor()
+        
+        # Create age_groups table: a small static lookup, stored WITHOUT ROWID
+        # with the fixed ids 1-10 that the symptom mappings below refer to
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS age_groups ({_AGE_GROUPS_COLUMNS}) WITHOUT ROWID")
+        
+        # Databases set up before that still have the old AUTOINCREMENT rowid
+        # table; copy it across, ids included so existing mappings stay valid
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'age_groups'")
+        schema = cursor.fetchone()[0].upper()
+        if 'WITHOUT ROWID' not in schema:
+            forget_sequence = ("DELETE FROM sqlite_sequence WHERE name = 'age_groups';"
+                               if 'AUTOINCREMENT' in schema else "")
+            conn.executescript(f"""
+                BEGIN;
+                CREATE TABLE age_groups_new ({_AGE_GROUPS_COLUMNS}) WITHOUT ROWID;
+                INSERT INTO age_groups_new (id, min_age, max_age, name, description)
+                    SELECT id, min_age, max_age, name, description FROM age_groups;
+                DROP TABLE age_groups;
+                ALTER TABLE age_groups_new RENAME TO age_groups;
+                {forget_sequence}
+                COMMIT;
+            """)
+        
+        age_groups = [
+            (1, 0, 10, 'Infant/Child', 'Newborns, infants, toddlers, and young children'),
+            (2, 11, 20, 'Adolescent', 'Teenagers and young adults'),
+            (3, 21, 30, 'Young Adult', 'Early adulthood'),
+            (4, 31, 40, 'Adult', 'Middle adulthood'),
+            (5, 41, 50, 'Middle Age', 'Prime middle age'),
+            (6, 51, 60, 'Mature Adult', 'Late middle age'),
+            (7, 61, 70, 'Senior', 'Early elderly'),
+            (8, 71, 80, 'Elderly', 'Advanced elderly'),
+            (9, 81, 90, 'Geriatric', 'Very elderly'),
+            (10, 91, 120, 'Advanced Geriatric', 'Oldest elderly'),
+        ]
+        
+        cursor.executemany("""
+            INSERT OR IGNORE INTO age_groups (id, min_age, max_age, name, description)
+            VALUES (?, ?, ?, ?, ?)
+        """, age_groups)
+        
+        conn.commit()
+        
+        # Verify
+        cursor.execute("SELECT * FROM age_groups ORDER BY min_age")
+        groups = cursor.fetchall()
+        out = ["\n✅ Created Age Groups:", "-" * 70]
+        for g in groups:
+            out.append(f"   {g[0]}. Ages {g[1]:3d}-{g[2]:3d}: {g[3]:20s} - {g[4]}")
+        print("\n".join(out))
+        
     return len(groups)
 
 
 def add_age_appropriate_symptoms():
     """Add comprehensive age-appropriate symptoms"""
-    conn = sqlite3.connect('data.db')
-    cursor = conn.cursor()
-    
-    # Add age_groups column to symptoms if not exists
-    cursor.execute("PRAGMA table_info(symptoms)")
-    columns = [col[1] for col in cursor.fetchall()]
-    if 'age_groups' not in columns:
-        cursor.execute("ALTER TABLE symptoms ADD COLUMN age_groups TEXT DEFAULT '[]'")
-    
-    # Age-specific symptoms (name, synonyms, applicable_age_group_ids)
-    # Age group IDs: 1=0-10, 2=11-20, 3=21-30, 4=31-40, 5=41-50, 6=51-60, 7=61-70, 8=71-80, 9=81-90, 10=91+
-    
-    new_symptoms = [
-        # PEDIATRIC (0-10) - Group 1
-        ('teething-pain', ['teething', 'baby teeth', 'tooth pain baby'], [1]),
-        ('diaper-rash', ['nappy rash', 'diaper irritation'], [1]),
-        ('earache', ['ear pain', 'ear infection', 'otitis'], [1, 2]),
-        ('crying-inconsolable', ['excessive crying', 'wont stop crying', 'fussy baby'], [1]),
-        ('poor-feeding', ['not eating', 'refusing food', 'feeding problems'], [1]),
-        ('lethargy', ['very sleepy', 'not responsive', 'limp baby'], [1]),
-        ('wheezing', ['difficulty breathing with sound', 'whistling breath'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('runny-nose', ['nasal congestion', 'stuffy nose', 'cold'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        
-        # ADOLESCENT (11-20) - Group 2
-        ('acne', ['pimples', 'spots', 'skin breakout'], [2, 3]),
-        ('menstrual-cramps', ['period pain', 'dysmenorrhea', 'menstrual pain'], [2, 3, 4, 5]),
-        ('sports-injury', ['sprain', 'strain', 'athletic injury'], [2, 3, 4]),
-        ('growing-pains', ['leg pain at night', 'growth aches'], [1, 2]),
-        ('anxiety', ['nervousness', 'panic', 'worried'], [2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        
-        # YOUNG ADULT (21-40) - Groups 3-4
-        ('pregnancy-symptoms', ['morning sickness', 'pregnancy nausea'], [3, 4]),
-        ('lower-back-pain', ['lumbar pain', 'back strain'], [3, 4, 5, 6, 7, 8, 9, 10]),
-        ('migraine', ['severe headache', 'visual disturbance headache'], [2, 3, 4, 5, 6]),
-        ('heartburn', ['acid reflux', 'GERD', 'indigestion'], [3, 4, 5, 6, 7, 8, 9, 10]),
-        ('insomnia', ['cant sleep', 'sleep problems'], [2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        
-        # MIDDLE AGE (41-60) - Groups 5-6
-        ('joint-pain', ['arthritis pain', 'knee pain', 'hip pain'], [4, 5, 6, 7, 8, 9, 10]),
-        ('high-blood-pressure-symptoms', ['hypertension symptoms', 'BP symptoms'], [5, 6, 7, 8, 9, 10]),
-        ('chest-tightness', ['tight chest', 'chest pressure'], [4, 5, 6, 7, 8, 9, 10]),
-        ('palpitations', ['heart racing', 'irregular heartbeat'], [3, 4, 5, 6, 7, 8, 9, 10]),
-        ('vision-changes', ['blurry vision', 'vision loss'], [5, 6, 7, 8, 9, 10]),
-        ('numbness', ['tingling', 'pins and needles', 'loss of sensation'], [4, 5, 6, 7, 8, 9, 10]),
-        ('unexplained-weight-loss', ['losing weight without trying'], [4, 5, 6, 7, 8, 9, 10]),
-        
-        # ELDERLY (61+) - Groups 7-10
-        ('confusion', ['disoriented', 'altered mental state', 'delirium'], [7, 8, 9, 10]),
-        ('memory-problems', ['forgetfulness', 'dementia symptoms'], [7, 8, 9, 10]),
-        ('falls', ['fell down', 'loss of balance', 'tripped'], [6, 7, 8, 9, 10]),
-        ('urinary-incontinence', ['cant hold urine', 'bladder control loss'], [7, 8, 9, 10]),
-        ('shortness-of-breath', ['breathless', 'SOB', 'dyspnea'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('swollen-legs', ['leg edema', 'ankle swelling', 'fluid retention'], [5, 6, 7, 8, 9, 10]),
-        ('chest-pain-exertion', ['chest pain with activity', 'angina'], [5, 6, 7, 8, 9, 10]),
-        
-        # COMMON ACROSS AGES (with age variations)
-        ('nausea', ['feeling sick', 'queasy'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('fatigue', ['tiredness', 'exhaustion', 'no energy'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('chills', ['shivering', 'cold sweats'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('sore-throat', ['throat pain', 'pharyngitis'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('back-pain', ['spine pain', 'back ache'], [2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('loss-of-appetite', ['not hungry', 'no appetite'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-    ]
-    
-    added = 0
-    updated = 0
-    
-    for name, synonyms, age_group_ids in new_symptoms:
-        # Check if symptom exists
-        cursor.execute("SELECT id FROM symptoms WHERE name = ?", (name,))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update age_groups for existing symptom
-            cursor.execute(
-                "UPDATE symptoms SET age_groups = ? WHERE name = ?",
-                (json.dumps(age_group_ids), name)
-            )
-            updated += 1
-            print(f"   ↻  Updated: {name} → ages {age_group_ids}")
-        else:
-            # Insert new symptom with synonyms stored as JSON
-            cursor.execute(
-                "INSERT INTO symptoms (name, synonyms, age_groups) VALUES (?, ?, ?)",
-                (name, json.dumps(synonyms), json.dumps(age_group_ids))
-            )
+    with _connect() as conn:
+        cursor = conn.cursor()
+        
+        # Add age_groups column to symptoms if not exists
+        try:
+            cursor.execute("ALTER TABLE symptoms ADD COLUMN age_groups TEXT DEFAULT '[]'")
+        except sqlite3.OperationalError as e:
+            if 'duplicate column name' not in str(e):
+                raise
+        
+        # The name lookups and UPDATE ... WHERE name = ? below need an index on name
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_symptoms_name ON symptoms(name)")
+        
+        # Age-specific symptoms (name, synonyms, applicable_age_group_ids)
+        # Age group IDs: 1=0-10, 2=11-20, 3=21-30, 4=31-40, 5=41-50, 6=51-60, 7=61-70, 8=71-80, 9=81-90, 10=91+
+        
+        new_symptoms = [
+            # PEDIATRIC (0-10) - Group 1
+            ('teething-pain', ['teething', 'baby teeth', 'tooth pain baby'], [1]),
+            ('diaper-rash', ['nappy rash', 'diaper irritation'], [1]),
+            ('earache', ['ear pain', 'ear infection', 'otitis'], [1, 2]),
+            ('crying-inconsolable', ['excessive crying', 'wont stop crying', 'fussy baby'], [1]),
+            ('poor-feeding', ['not eating', 'refusing food', 'feeding problems'], [1]),
+            ('lethargy', ['very sleepy', 'not responsive', 'limp baby'], [1]),
+            ('wheezing', ['difficulty breathing with sound', 'whistling breath'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('runny-nose', ['nasal congestion', 'stuffy nose', 'cold'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
             
-            added += 1
-            print(f"   ✅ Added: {name} → ages {age_group_ids}")
-    
-    # Update existing symptoms with appropriate age groups
-    existing_mappings = [
-        ('fever', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('headache', [2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('cough', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('vomiting', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('dizziness', [2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('abdominal-pain', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('rash', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('weakness', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('chest-pain', [3, 4, 5, 6, 7, 8, 9, 10]),  # Rare in children
-        ('difficulty-breathing', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('stiff-neck', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('seizure', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('severe-bleeding', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('severe-burn', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('unconscious', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-        ('fracture', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
-    ]
-    
-    for name, age_groups in existing_mappings:
-        cursor.execute(
-            "UPDATE symptoms SET age_groups = ? WHERE name = ?",
-            (json.dumps(age_groups), name)
-        )
-    
-    conn.commit()
-    
-    # Summary
-    cursor.execute("SELECT COUNT(*) FROM symptoms")
-    total = cursor.fetchone()[0]
-    
-    conn.close()
+            # ADOLESCENT (11-20) - Group 2
+            ('acne', ['pimples', 'spots', 'skin breakout'], [2, 3]),
+            ('menstrual-cramps', ['period pain', 'dysmenorrhea', 'menstrual pain'], [2, 3, 4, 5]),
+            ('sports-injury', ['sprain', 'strain', 'athletic injury'], [2, 3, 4]),
+            ('growing-pains', ['leg pain at night', 'growth aches'], [1, 2]),
+            ('anxiety', ['nervousness', 'panic', 'worried'], [2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            
+            # YOUNG ADULT (21-40) - Groups 3-4
+            ('pregnancy-symptoms', ['morning sickness', 'pregnancy nausea'], [3, 4]),
+            ('lower-back-pain', ['lumbar pain', 'back strain'], [3, 4, 5, 6, 7, 8, 9, 10]),
+            ('migraine', ['severe headache', 'visual disturbance headache'], [2, 3, 4, 5, 6]),
+            ('heartburn', ['acid reflux', 'GERD', 'indigestion'], [3, 4, 5, 6, 7, 8, 9, 10]),
+            ('insomnia', ['cant sleep', 'sleep problems'], [2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            
+            # MIDDLE AGE (41-60) - Groups 5-6
+            ('joint-pain', ['arthritis pain', 'knee pain', 'hip pain'], [4, 5, 6, 7, 8, 9, 10]),
+            ('high-blood-pressure-symptoms', ['hypertension symptoms', 'BP symptoms'], [5, 6, 7, 8, 9, 10]),
+            ('chest-tightness', ['tight chest', 'chest pressure'], [4, 5, 6, 7, 8, 9, 10]),
+            ('palpitations', ['heart racing', 'irregular heartbeat'], [3, 4, 5, 6, 7, 8, 9, 10]),
+            ('vision-changes', ['blurry vision', 'vision loss'], [5, 6, 7, 8, 9, 10]),
+            ('numbness', ['tingling', 'pins and needles', 'loss of sensation'], [4, 5, 6, 7, 8, 9, 10]),
+            ('unexplained-weight-loss', ['losing weight without trying'], [4, 5, 6, 7, 8, 9, 10]),
+            
+            # ELDERLY (61+) - Groups 7-10
+            ('confusion', ['disoriented', 'altered mental state', 'delirium'], [7, 8, 9, 10]),
+            ('memory-problems', ['forgetfulness', 'dementia symptoms'], [7, 8, 9, 10]),
+            ('falls', ['fell down', 'loss of balance', 'tripped'], [6, 7, 8, 9, 10]),
+            ('urinary-incontinence', ['cant hold urine', 'bladder control loss'], [7, 8, 9, 10]),
+            ('shortness-of-breath', ['breathless', 'SOB', 'dyspnea'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('swollen-legs', ['leg edema', 'ankle swelling', 'fluid retention'], [5, 6, 7, 8, 9, 10]),
+            ('chest-pain-exertion', ['chest pain with activity', 'angina'], [5, 6, 7, 8, 9, 10]),
+            
+            # COMMON ACROSS AGES (with age variations)
+            ('nausea', ['feeling sick', 'queasy'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('fatigue', ['tiredness', 'exhaustion', 'no energy'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('chills', ['shivering', 'cold sweats'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('sore-throat', ['throat pain', 'pharyngitis'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('back-pain', ['spine pain', 'back ache'], [2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('loss-of-appetite', ['not hungry', 'no appetite'], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+        ]
+        
+        # The names already present only decide what gets reported; the write
+        # itself is one UPSERT per symptom: new names are inserted with their
+        # synonyms, existing ones just get their age_groups replaced
+        existing_names = {row[0] for row in cursor.execute("SELECT name FROM symptoms")}
+        added = 0
+        updated = 0
+        out = []
+        
+        for name, synonyms, age_group_ids in new_symptoms:
+            if name in existing_names:
+                updated += 1
+                out.append(f"   ↻  Updated: {name} → ages {age_group_ids}")
+            else:
+                existing_names.add(name)
+                added += 1
+                out.append(f"   ✅ Added: {name} → ages {age_group_ids}")
+        
+        cursor.executemany("""
+            INSERT INTO symptoms (name, synonyms, age_groups) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET age_groups = excluded.age_groups
+        """, [(name, _dumps(synonyms), _age_groups_json(tuple(age_group_ids)))
+              for name, synonyms, age_group_ids in new_symptoms])
+        print("\n".join(out))
+        
+        # Update existing symptoms with appropriate age groups
+        existing_mappings = [
+            ('fever', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('headache', [2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('cough', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('vomiting', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('dizziness', [2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('abdominal-pain', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('rash', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('weakness', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('chest-pain', [3, 4, 5, 6, 7, 8, 9, 10]),  # Rare in children
+            ('difficulty-breathing', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('stiff-neck', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('seizure', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('severe-bleeding', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('severe-burn', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('unconscious', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+            ('fracture', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+        ]
+        
+        # One UPDATE joined against the mappings as a VALUES table
+        values = ", ".join(["(?, ?)"] * len(existing_mappings))
+        cursor.execute(f"""
+            WITH m(name, age_groups) AS (VALUES {values})
+            UPDATE symptoms SET age_groups = m.age_groups
+            FROM m WHERE symptoms.name = m.name
+        """, [x for name, age_groups in existing_mappings for x in (name, _age_groups_json(tuple(age_groups)))])
+        
+        # Everything above ran in the one transaction sqlite3 opened at the first
+        # write; a single commit (and fsync) covers all of it
+        conn.commit()
+        
+        # Summary
+        cursor.execute("SELECT COUNT(*) FROM symptoms")
+        total = cursor.fetchone()[0]
+        
     
     print(f"\n✅ Symptom Database Updated:")
     print(f"   - {added} new symptoms added")
@@ -0,0 +1,110 @@
+"""The compiled /triage fast path must agree with CLIPS on published rules."""
+import os
+import random
+import tempfile
+import unittest
+
+import clips
+
+import app
+
+SYMPTOMS = ['fever', 'cough', 'headache', 'rash']
+RESULTS = [
+    [{'set_triage_level': 'RED'}, {'set_transport': 'ambulance'}, {'set_rationale': 'urgent'}],
+    [{'set_triage_level': 'YELLOW'}, {'set_transport': 'matatu'}, {'set_rationale': 'soon'}],
+    [{'set_triage_level': 'GREEN'}, {'set_transport': 'chemist'}, {'set_rationale': 'self care'}],
+]
+
+
+def _random_rule(rng, idx, saliences):
+    conditions = [{'field': 'symptom', 'operator': 'contains', 'value': s}
+                  for s in rng.sample(SYMPTOMS, rng.randint(0, 2))]
+    if rng.random() < 0.5:
+        conditions.append({'field': 'age', 'operator': rng.choice(['>', '<=']),
+                           'value': rng.choice([18, 50, 65])})
+    if rng.random() < 0.3:
+        conditions.append({'field': 'history', 'operator': '=', 'value': 'diabetes'})
+    if not conditions:
+        conditions.append({'field': 'symptom', 'operator': 'contains', 'value': SYMPTOMS[0]})
+    return {
+        'name': f'Rule_{idx}',
+        'salience': rng.choice(saliences),
+        'conditions': conditions,
+        'actions': rng.choice(RESULTS),
+    }
+
+
+def _random_patient(rng):
+    patient = {'symptoms': rng.sample(SYMPTOMS, rng.randint(0, 3))}
+    if rng.random() < 0.8:
+        patient['age'] = rng.choice([5, 30, 50, 70])
+    if rng.random() < 0.4:
+        patient['history'] = 'diabetes'
+    return patient
+
+
+def _clips_environment(rules):
+    env = clips.Environment()
+    env.load(app._templates_path)
+    with tempfile.NamedTemporaryFile('w', suffix='.clp', delete=False) as f:
+        f.write(app.translate_rules_to_clp(rules))
+    try:
+        env.load(f.name)
+    finally:
+        os.unlink(f.name)
+    return env
+
+
+def _clips_triage(env, patient):
+    env.reset()
+    app.assert_patient_facts(env, patient)
+    env.run()
+    result = app._extract_triage_result(env)
+    result.setdefault('transport', 'none')
+    return result
+
+
+class CompiledRulesMatchClipsTest(unittest.TestCase):
+
+    def _check(self, saliences, trials=100, seed=0):
+        rng = random.Random(seed)
+        compared = 0
+        for _ in range(trials):
+            rules = [_random_rule(rng, i, saliences) for i in range(rng.randint(1, 5))]
+            compiled = app.compile_rules(rules)
+            if compiled is None:
+                # Only conflicting ties may disable the fast path
+                by_salience = {}
+                for r in rules:
+                    by_salience.setdefault(r['salience'], set()).add(app._dumps(r['actions']))
+                self.assertTrue(any(len(v) > 1 for v in by_salience.values()), rules)
+                continue
+            env = _clips_environment(rules)
+            for _ in range(5):
+                patient = _random_patient(rng)
+                self.assertEqual(
+                    app._evaluate_compiled_rules(compiled, patient),
+                    _clips_triage(env, patient),
+                    (rules, patient),
+                )
+                compared += 1
+        return compared
+
+    def test_distinct_saliences(self):
+        self.assertGreater(self._check(saliences=range(10, 1000)), 0)
+
+    def test_tied_saliences(self):
+        self.assertGreater(self._check(saliences=[10, 20, 30], trials=200, seed=1), 0)
+
+    def test_conflicting_tie_falls_back_to_clips(self):
+        rules = [
+            {'name': 'A', 'salience': 10, 'actions': RESULTS[0],
+             'conditions': [{'field': 'symptom', 'operator': 'contains', 'value': 'fever'}]},
+            {'name': 'B', 'salience': 10, 'actions': RESULTS[1],
+             'conditions': [{'field': 'symptom', 'operator': 'contains', 'value': 'cough'}]},
+        ]
+        self.assertIsNone(app.compile_rules(rules))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Seeding, publishing and triaging must work end to end on a fresh install."""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the scratch copy: publish the seeded rules, then triage
+SCRIPT = '''
+import json
+import app
+client = app.app.test_client()
+publish = client.post('/api/publish-rules')
+results = [
+    client.post('/triage', json=patient).get_json()
+    for patient in (
+        {'age': 65, 'symptoms': ['chest-pain']},
+        {'age': 30, 'symptoms': ['headache']},
+        {'age': 30, 'symptoms': ['fever', 'cough', 'headache']},
+    )
+]
+print(json.dumps({'publish': publish.status_code, 'results': results}))
+'''
+
+
+class SeedPublishTriageTest(unittest.TestCase):
+
+    def setUp(self):
+        # Publishing rewrites knowledge_base/rules.clp and seeding writes
+        # data.db, so everything runs in a throwaway copy of the app
+        self.dir = tempfile.mkdtemp()
+        for name in ('app.py', 'db.py', 'location_service.py', 'seed_symptoms_rules.py'):
+            shutil.copy(os.path.join(ROOT, name), self.dir)
+        shutil.copytree(os.path.join(ROOT, 'knowledge_base'), os.path.join(self.dir, 'knowledge_base'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _run(self, *args):
+        return subprocess.run([sys.executable, *args], cwd=self.dir, check=True,
+                              capture_output=True, text=True).stdout
+
+    def test_seeded_rules_publish_and_triage(self):
+        self._run('seed_symptoms_rules.py')
+        out = json.loads(self._run('-c', SCRIPT).strip().splitlines()[-1])
+        self.assertEqual(out['publish'], 200)
+        cardiac, headache, flu = out['results']
+        self.assertEqual((cardiac['triage_level'], cardiac['transport']), ('RED', 'ambulance'))
+        self.assertIn('heart attack', cardiac['rationale'])
+        self.assertEqual((headache['triage_level'], headache['transport']), ('GREEN', 'chemist'))
+        self.assertIn('Mild headache', headache['rationale'])
+        self.assertEqual(flu['triage_level'], 'YELLOW')
+        self.assertIn('Flu-like', flu['rationale'])
+
+
+if __name__ == '__main__':
+    unittest.main()
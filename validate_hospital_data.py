@@ -6,83 +6,218 @@ Senior Dev Tool:
 - Fills missing coordinates via geocoding
 - Adds reverse-geocoded addresses
 - Generates data quality report
+- Remembers lookups in a geocode_cache table across runs
 """
 
 import sqlite3
+import contextlib
 import logging
-from location_service import location_service
+import logging.handlers
+import time
+from concurrent.futures import ThreadPoolExecutor
+from location_service import location_service, GEOCODE_CONCURRENCY
 
-logging.basicConfig(level=logging.INFO)
+# Per-hospital progress lines are held in memory and written out in batches
+# (errors still go straight through), so a piped or redirected run isn't
+# one write per line
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+_log_buffer = logging.handlers.MemoryHandler(
+    capacity=1024, flushLevel=logging.ERROR, target=_log_stream
+)
+logging.basicConfig(level=logging.INFO, handlers=[_log_buffer])
 logger = logging.getLogger(__name__)
 
+# Concurrent geocoding lookups, as many as location_service's provider pool
+# runs at once (more would only queue there); its per-provider token
+# buckets still hold each upstream API to its rate limit
+GEOCODE_WORKERS = GEOCODE_CONCURRENCY
+
+# Failed geocodes are remembered too, and retried once they are this old
+GEOCODE_RETRY_AFTER = 86400
+
+
+@contextlib.contextmanager
+def _connect():
+    """Open data.db (WAL, relaxed syncing, larger page cache); closed on exit"""
+    conn = sqlite3.connect('data.db')
+    try:
+        conn.executescript(
+            "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; "
+            "PRAGMA temp_store=MEMORY; PRAGMA cache_size=-65536;"
+        )
+        yield conn
+    finally:
+        conn.close()
+
+
+def _load_geocode_cache(cursor):
+    """Create the geocode_cache table if needed and return its rows by query"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS geocode_cache (
+            query TEXT PRIMARY KEY,
+            lat REAL,
+            lon REAL,
+            formatted TEXT,
+            ts INTEGER
+        )
+    """)
+    cursor.execute("SELECT query, lat, lon, formatted, ts FROM geocode_cache")
+    return {row[0]: row[1:] for row in cursor}
+
+
+def _has_valid_coords(lat, lon):
+    """True when a hospital already has usable coordinates"""
+    return bool(lat and lon and location_service.validate_coordinates(lat, lon))
+
+
+def _reverse_key(lat, lon):
+    return f"rev:{round(lat, 5)},{round(lon, 5)}"
+
 
 def validate_and_enhance_hospitals():
     """
     Validate and enhance hospital data with coordinates and addresses
     """
-    conn = sqlite3.connect('data.db')
-    cursor = conn.cursor()
-    
-    # Get all hospitals
-    cursor.execute("SELECT id, name, address, latitude, longitude, contact FROM hospitals")
-    hospitals = cursor.fetchall()
-    
-    stats = {
-        'total': len(hospitals),
-        'valid_coords': 0,
-        'missing_coords': 0,
-        'geocoded': 0,
-        'enhanced_address': 0,
-        'errors': 0
-    }
-    
-    logger.info(f"Validating {stats['total']} hospitals...")
-    
-    for hospital_id, name, address, lat, lon, contact in hospitals:
-        try:
+    with _connect() as conn:
+        # The SQL below filters with the same Python check the loop uses, so
+        # the two can never disagree about which hospitals need work
+        conn.create_function('valid_coords', 2, _has_valid_coords, deterministic=True)
+        cursor = conn.cursor()
+        
+        # Totals for the report come from SQL; only hospitals with something to
+        # fix are streamed (off their own cursor) into the loop below
+        cursor.execute("SELECT COUNT(*), COUNT(CASE WHEN valid_coords(latitude, longitude) THEN 1 END) FROM hospitals")
+        total, valid_coords = cursor.fetchone()
+        
+        stats = {
+            'total': total,
+            'valid_coords': valid_coords,
+            'missing_coords': total - valid_coords,
+            'geocoded': 0,
+            'enhanced_address': 0,
+            'errors': 0
+        }
+        
+        logger.info("Validating %s hospitals...", stats['total'])
+        
+        # Phase 1: classify every hospital without touching the network
+        need_address = []  # (id, name, lat, lon)
+        need_coords = []   # (id, name, search term)
+        hospitals = conn.execute("""
+            SELECT id, name, address, latitude, longitude, contact FROM hospitals
+            WHERE NOT valid_coords(latitude, longitude) OR address IS NULL OR address = ''
+        """)
+        for hospital_id, name, address, lat, lon, contact in hospitals:
             # Check if coordinates exist and are valid
-            if lat and lon and location_service.validate_coordinates(lat, lon):
-                stats['valid_coords'] += 1
-                
+            if _has_valid_coords(lat, lon):
                 # Enhance address if missing
                 if not address:
-                    logger.info(f"Enhancing address for {name}...")
-                    enhanced_address = location_service.reverse_geocode(lat, lon)
-                    if enhanced_address:
-                        cursor.execute(
-                            "UPDATE hospitals SET address = ? WHERE id = ?",
-                            (enhanced_address, hospital_id)
-                        )
-                        stats['enhanced_address'] += 1
-                        logger.info(f"  ✓ Added address: {enhanced_address}")
+                    logger.info("Enhancing address for %s...", name)
+                    need_address.append((hospital_id, name, lat, lon))
             else:
-                stats['missing_coords'] += 1
-                logger.warning(f"Missing/invalid coordinates for {name}")
+                logger.warning("Missing/invalid coordinates for %s", name)
                 
                 # Try to geocode from address or name
                 search_term = address if address else name
                 if search_term:
-                    logger.info(f"Geocoding {name}...")
-                    result = location_service.geocode(search_term)
+                    logger.info("Geocoding %s...", name)
+                    need_coords.append((hospital_id, name, search_term))
+        
+        # Phase 2: answer what earlier runs already looked up from geocode_cache,
+        # then run the remaining lookups concurrently so their round trips overlap
+        cache = _load_geocode_cache(cursor)
+        now = int(time.time())
+        cache_rows = []
+        
+        geocoded = [None] * len(need_coords)
+        pending = []
+        for i, (_, _, term) in enumerate(need_coords):
+            hit = cache.get(term)
+            if hit is not None and (hit[2] is not None or now - hit[3] < GEOCODE_RETRY_AFTER):
+                result = {'lat': hit[0], 'lon': hit[1], 'formatted_address': hit[2]} if hit[2] is not None else None
+                geocoded[i] = (result, None)
+            else:
+                pending.append(i)
+        
+        addresses = [None] * len(need_address)
+        reverse_pending = []
+        for i, (_, _, lat, lon) in enumerate(need_address):
+            hit = cache.get(_reverse_key(lat, lon))
+            if hit is not None and hit[2] is not None:
+                addresses[i] = hit[2]
+            else:
+                reverse_pending.append(i)
+        
+        def geocode(i):
+            try:
+                return location_service.geocode(need_coords[i][2]), None
+            except Exception as e:
+                return None, e
+        
+        # The extra worker only waits on reverse_geocode_many, whose HTTP calls
+        # run on location_service's reverse pool rather than the provider pool
+        # the forward lookups use, so the two batches proceed side by side
+        with ThreadPoolExecutor(max_workers=GEOCODE_WORKERS + 1) as pool:
+            reverse = pool.submit(
+                location_service.reverse_geocode_many,
+                [(need_address[i][2], need_address[i][3]) for i in reverse_pending]
+            )
+            for i, (result, error) in zip(pending, pool.map(geocode, pending)):
+                geocoded[i] = (result, error)
+                if error is None:
+                    # Failures are cached with NULLs so they are retried later
                     if result:
-                        cursor.execute(
-                            "UPDATE hospitals SET latitude = ?, longitude = ?, address = ? WHERE id = ?",
-                            (result['lat'], result['lon'], result['formatted_address'], hospital_id)
-                        )
-                        stats['geocoded'] += 1
-                        logger.info(f"  ✓ Added coordinates: {result['lat']}, {result['lon']}")
+                        cache_rows.append((need_coords[i][2], result['lat'], result['lon'],
+                                           result['formatted_address'], now))
                     else:
-                        logger.error(f"  ✗ Could not geocode {name}")
-                        stats['errors'] += 1
+                        cache_rows.append((need_coords[i][2], None, None, None, now))
+            
+            try:
+                for i, address in zip(reverse_pending, reverse.result()):
+                    addresses[i] = address
+                    if address:
+                        lat, lon = need_address[i][2], need_address[i][3]
+                        cache_rows.append((_reverse_key(lat, lon), lat, lon, address, now))
+            except Exception as e:
+                logger.error("Error reverse geocoding hospitals: %s", e)
+                stats['errors'] += len(reverse_pending)
         
-        except Exception as e:
-            logger.error(f"Error processing {name}: {e}")
-            stats['errors'] += 1
-    
-    conn.commit()
-    conn.close()
+        # Phase 3: write every result back in one transaction
+        address_updates = []
+        for (hospital_id, name, lat, lon), enhanced_address in zip(need_address, addresses):
+            if enhanced_address:
+                address_updates.append((enhanced_address, hospital_id))
+                stats['enhanced_address'] += 1
+                logger.info("  ✓ Added address: %s", enhanced_address)
+        
+        coord_updates = []
+        for (hospital_id, name, _), (result, error) in zip(need_coords, geocoded):
+            if error is not None:
+                logger.error("Error processing %s: %s", name, error)
+                stats['errors'] += 1
+            elif result:
+                coord_updates.append((result['lat'], result['lon'], result['formatted_address'], hospital_id))
+                stats['geocoded'] += 1
+                logger.info("  ✓ Added coordinates: %s, %s", result['lat'], result['lon'])
+            else:
+                logger.error("  ✗ Could not geocode %s", name)
+                stats['errors'] += 1
+        
+        # Rolled back as a whole if any batch fails
+        with conn:
+            conn.executemany("UPDATE hospitals SET address = ? WHERE id = ?", address_updates)
+            conn.executemany(
+                "UPDATE hospitals SET latitude = ?, longitude = ?, address = ? WHERE id = ?",
+                coord_updates
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO geocode_cache (query, lat, lon, formatted, ts) VALUES (?, ?, ?, ?, ?)",
+                cache_rows
+            )
     
     # Print report
+    _log_buffer.flush()
     print("\n" + "="*60)
     print("HOSPITAL DATA QUALITY REPORT")
     print("="*60)